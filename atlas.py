@@ -0,0 +1,112 @@
+import json
+import os
+from os.path import getmtime, getsize, isfile, join
+import pygame
+
+# packed atlas folder: page0.png, page1.png ... and index.json of
+#   "pages":   number of pages
+#   "regions": path of each packed png: [page, x, y, width, height]
+#   "sources": path of each packed png: [modified time, size in bytes]
+
+FOLDERS = ["objects", "characters", "bullets", "guns"]  # packed, with subfolders
+PAGE = 2048  # size of a page, bigger pngs get a page to themselves
+
+
+def sources(root) -> list[str]:
+    paths = []
+    for folder in FOLDERS:
+        for path, _, files in os.walk(join(root, folder)):
+            paths += [join(path, f) for f in sorted(files) if f.endswith(".png")]
+    return paths
+
+
+# places each (width, height) on shelves of pages, tallest first. returns
+# (page, x, y) of each and the size of each page
+def pack(sizes) -> tuple[list[tuple[int, int, int]], list[tuple[int, int]]]:
+    places, pages = [None] * len(sizes), []
+    x = y = shelf = 0
+    for n in sorted(range(len(sizes)), key=lambda n: -sizes[n][1]):
+        w, h = sizes[n]
+        if w > PAGE or h > PAGE:
+            places[n] = (len(pages), 0, 0)
+            pages.append((w, h))
+            x = y = shelf = PAGE  # start the next one on a new page
+            continue
+        if x + w > PAGE:
+            x, y, shelf = 0, y + shelf, 0
+        if not pages or pages[-1] != (PAGE, PAGE) or y + h > PAGE:
+            pages.append((PAGE, PAGE))
+            x = y = shelf = 0
+        places[n] = (len(pages) - 1, x, y)
+        x, shelf = x + w, max(shelf, h)
+    return places, pages
+
+
+def build_atlas(root, folder) -> dict:
+    paths = sources(root)
+    images = [pygame.image.load(path) for path in paths]
+    places, sizes = pack([image.get_size() for image in images])
+    pages = [pygame.Surface(size, pygame.SRCALPHA, 32) for size in sizes]
+    index = {"pages": len(pages), "regions": {}, "sources": {}}
+    for path, image, (page, x, y) in zip(paths, images, places):
+        pages[page].blit(image, (x, y))
+        index["regions"][path] = [page, x, y, *image.get_size()]
+        index["sources"][path] = [getmtime(path), getsize(path)]
+    os.makedirs(folder, exist_ok=True)
+    for n, page in enumerate(pages):
+        pygame.image.save(page, join(folder, f"page{n}.png"))
+    with open(join(folder, "index.json"), "w") as file:
+        json.dump(index, file)
+    return index
+
+
+# sprites packed into a few large surfaces by build_atlas. pages are loaded
+# the first time a png on them is asked for, pngs come back as subsurfaces
+class PackedAtlas:
+    def __init__(self, folder) -> None:
+        with open(join(folder, "index.json")) as file:
+            index = json.load(file)
+        self.folder, self.regions = folder, index["regions"]
+        self.sources, self.pages = index["sources"], [None] * index["pages"]
+        self.files = [join(folder, f"page{n}.png") for n in range(index["pages"])]
+
+    def __contains__(self, path) -> bool:
+        return path in self.regions
+
+    # no packed png has been edited, removed or replaced since packing
+    def fresh(self) -> bool:
+        for path, (modified, size) in self.sources.items():
+            if not isfile(path) or (getmtime(path), getsize(path)) != (modified, size):
+                return False
+        return True
+
+    # the png at path, needs the display to be set up
+    def region(self, path) -> pygame.Surface:
+        page, x, y, w, h = self.regions[path]
+        if self.pages[page] is None:
+            self.adopt(self.files[page], pygame.image.load(self.files[page]))
+        return self.pages[page].subsurface((x, y, w, h))
+
+    # file of the page the png at path is on, if it hasn't been loaded yet
+    def unloaded(self, path):
+        page = self.regions[path][0]
+        return self.files[page] if self.pages[page] is None else None
+
+    # keeps the page in file once decoded, eg by a Loader. needs the display
+    def adopt(self, file, image) -> None:
+        page = self.files.index(file)
+        if self.pages[page] is None:
+            self.pages[page] = image.convert_alpha()
+
+
+# the atlas in folder if it's been built and is up to date, else None
+def open_atlas(folder):
+    if not folder or not isfile(join(folder, "index.json")):
+        return None
+    packed = PackedAtlas(folder)
+    return packed if packed.fresh() else None
+
+
+if __name__ == "__main__":
+    index = build_atlas("assets", "atlas")
+    print(f"packed {len(index['regions'])} pngs into {index['pages']} pages in atlas")
@@ -0,0 +1,223 @@
+import argparse
+import json
+import platform
+from math import ceil, cos, sin, tau
+from os.path import join
+from time import perf_counter
+import pygame
+import headless
+from bullets import BulletPool
+from spatial import mask_box
+import game
+
+TIMED = [  # (owner, attribute, name in results)
+    (game, "tick", "tick"),
+    (game.Player, "collision", "Player.collision"),
+    (BulletPool, "step", "BulletPool.step"),
+    (game.Bullet, "loop", "Bullet.loop"),
+    (game, "draw", "draw"),
+    (game, "process_levels", "process_levels"),
+]
+CALLS = ["process_levels"]  # rare, so timed per call instead of per frame
+TICKS = 600  # ticks each scenario runs for, split between its levels
+STORM_STATS = [0, 0, 20, 0.3, 0.7, 1]  # a bullet every tick and no recoil
+CENTER = (game.WIDTH // 2, game.HEIGHT // 2)
+
+
+# adds up the time spent in the TIMED functions each frame. a frame starts
+# when game.tick is called and ends at the next one, so it includes the draw.
+# functions not called in a frame count as 0 for it, and the first frame also
+# has what ran before the first tick. ones in CALLS keep each call's time
+class Timers:
+    def __init__(self) -> None:
+        self.frames, self.current, self.originals = {}, {}, []
+        self.calls = {name: [] for name in CALLS}
+        self.started = False  # the first tick has been called
+
+    def wrap(self, owner, attr, name) -> None:
+        original = getattr(owner, attr)
+        self.originals.append((owner, attr, original))
+
+        def timed(*args, **kwargs):
+            if name == "tick":
+                self.frame()
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                time = perf_counter() - start
+                if name in self.calls:
+                    self.calls[name].append(time)
+                else:
+                    self.current[name] = self.current.get(name, 0) + time
+
+        setattr(owner, attr, timed)
+
+    def frame(self) -> None:
+        if not self.started:  # time before the first tick goes in its frame
+            self.started = True
+            return None
+        for _, _, name in TIMED:
+            if name not in self.calls:
+                self.frames.setdefault(name, []).append(self.current.get(name, 0))
+        self.current = {}
+
+    def __enter__(self):
+        for timed in TIMED:
+            self.wrap(*timed)
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.frame()
+        for owner, attr, original in reversed(self.originals):
+            setattr(owner, attr, original)
+
+
+def percentile(times, p) -> float:
+    return times[max(ceil(p / 100 * len(times)) - 1, 0)]
+
+
+def summary(times) -> dict:
+    times = sorted(times)
+    return {
+        "frames": len(times),
+        "mean": sum(times) / len(times),
+        "p50": percentile(times, 50),
+        "p95": percentile(times, 95),
+        "p99": percentile(times, 99),
+        "max": times[-1],
+    }
+
+
+def call_summary(times) -> dict:
+    times = sorted(times)
+    return {
+        "calls": len(times),
+        "p50": percentile(times, 50) if times else 0,
+        "max": times[-1] if times else 0,
+    }
+
+
+# runs right, jumping every second
+def run_right(ticks) -> list[tuple]:
+    keys = [pygame.K_d]
+    return [(keys + [pygame.K_w] * (t % 60 < 10), CENTER, False) for t in range(ticks)]
+
+
+# stands still shooting at the mouse circling the player once a second
+def spray(ticks) -> list[tuple]:
+    inputs = []
+    for t in range(ticks):
+        angle = t / 60 * tau
+        mouse = (CENTER[0] + 300 * cos(angle), CENTER[1] + 300 * sin(angle))
+        inputs.append(((), mouse, True))
+    return inputs
+
+
+# levels with a goal just under where the player spawns, or over it if gravity
+# is upside down, except the last. the player falls onto it a few ticks in
+# and goes on to the next level the way the game does
+def with_goals(levels) -> list:
+    levels, placed = list(levels), []
+    goal = mask_box(game.load_mask(join(game.PATH, "objects"), "goal", 64, 64)[0])
+    for level in levels[:-1]:
+        start, _, gravity = level[0]
+        game.gravity = gravity  # the player's sprite depends on it
+        player = game.Player(start, game.STATS, game.GUN, game.AMMO, 128, 128)
+        box = mask_box(player.mask).move(player.rect.topleft)
+        y = box.bottom + 2 - goal.top if gravity > 0 else box.top - 2 - goal.bottom
+        placed.append(list(level) + [[(box.centerx - 32, y, 64, 64), "goal"]])
+    return placed + [levels[-1]]
+
+
+# name: (levels to play in turn, inputs for each, player stats, whether the
+# levels are played through their goals with_goals, prefetching each next one)
+SCENARIOS = {
+    "blocks": ([7], run_right, game.STATS, False),
+    "targets": ([8], spray, game.STATS, False),
+    "bouncepads": ([9], run_right, game.STATS, False),
+    "storm": ([1], spray, STORM_STATS, False),
+    "transition": ([1], headless.idle, game.STATS, True),
+}
+
+
+def run(name, ticks) -> dict:
+    levels, inputs, stats, goals = SCENARIOS[name]
+    if ticks is None:
+        ticks = TICKS // len(levels)
+    default = game.STATS, game.LEVELS, game.headless
+    game.STATS = stats
+    if goals:
+        game.LEVELS, game.headless = with_goals(game.LEVELS), False
+    try:
+        with Timers() as timers:
+            for level_num in levels:
+                headless.simulate(level_num, inputs(ticks), seed=0, draw=True)
+    finally:
+        game.STATS, game.LEVELS, game.headless = default
+        game.upcoming = None
+    results = {name: summary(times) for name, times in timers.frames.items()}
+    for name, times in timers.calls.items():
+        results[name] = call_summary(times)
+    return results
+
+
+def compare(results, old) -> str:
+    lines = []
+    for scenario, timings in results["scenarios"].items():
+        for name, now in timings.items():
+            before = old["scenarios"].get(scenario, {}).get(name)
+            if before:
+                change = now["p50"] / before["p50"] - 1 if before["p50"] else 0
+                lines.append(f"{scenario:<14} {name:<18} p50 {change:+7.1%}")
+    return "\n".join(lines)
+
+
+def report(results) -> str:
+    lines = []
+    for scenario, timings in results["scenarios"].items():
+        lines.append(scenario)
+        for name, t in timings.items():
+            if "calls" in t:
+                lines.append(
+                    f"  {name:<18} {t['calls']:>5} calls "
+                    f"  p50 {t['p50'] * 1000:7.3f}ms  max {t['max'] * 1000:7.3f}ms"
+                )
+                continue
+            lines.append(
+                f"  {name:<18} {t['frames']:>5} frames"
+                f"  p50 {t['p50'] * 1000:7.3f}ms  p95 {t['p95'] * 1000:7.3f}ms"
+                f"  p99 {t['p99'] * 1000:7.3f}ms"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="time the game in fixed scenarios")
+    parser.add_argument("scenarios", nargs="*", help=", ".join(SCENARIOS))
+    parser.add_argument("--ticks", type=int, help=f"ticks per level ({TICKS} total)")
+    parser.add_argument("--out", help="json file to write results to")
+    parser.add_argument("--compare", help="json results of an earlier run")
+    args = parser.parse_args()
+
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"no scenario {name!r}, choose from {', '.join(SCENARIOS)}")
+    game.open_window(True)
+    game.wd = pygame.display.set_mode(game.DIMS)  # draw full frames
+    results = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "collision": game.COLLISION,
+        "stream": game.STREAM,
+        "scenarios": {
+            name: run(name, args.ticks) for name in args.scenarios or SCENARIOS
+        },
+    }
+    print(report(results))
+    if args.compare:
+        with open(args.compare) as file:
+            print("\n" + compare(results, json.load(file)))
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(results, file, indent=2)
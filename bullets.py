@@ -0,0 +1,108 @@
+from math import copysign, trunc
+
+try:
+    import numpy
+except ImportError:  # bullets are moved one at a time instead
+    numpy = None
+
+FIELDS = ["x", "y", "xvel", "yvel", "lastx", "lasty", "angle", "spin", "fall", "mass"]
+
+
+# pygame rects round halves away from zero when given floats
+def rounded(value) -> int:
+    return trunc(value + copysign(0.5, value))
+
+
+# every bullet in flight, stored as one array per field so a tick moves them
+# all at once. slots of dead bullets are reused, as are the views made for
+# them by view(pool, slot), which is what the rest of the game sees
+class BulletPool:
+    def __init__(self, view, capacity=64) -> None:
+        self.view, self.capacity = view, 0
+        self.live, self.free, self.views = [], [], []  # live is in firing order
+        for name in FIELDS:
+            setattr(self, name, numpy.zeros(0) if numpy else [])
+        self.grow(capacity)
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def __iter__(self):
+        return (self.views[slot] for slot in self.live)
+
+    def grow(self, capacity) -> None:
+        added = range(self.capacity, capacity)
+        for name in FIELDS:
+            if numpy:
+                setattr(self, name, numpy.resize(getattr(self, name), capacity))
+            else:
+                getattr(self, name).extend([0] * len(added))
+        self.views += [self.view(self, slot) for slot in added]
+        self.free += reversed(added)
+        self.capacity = capacity
+
+    def spawn(self, x, y, xvel, yvel, spin, mass) -> int:
+        if not self.free:
+            self.grow(self.capacity * 2)
+        slot = self.free.pop()
+        self.x[slot], self.y[slot] = self.lastx[slot], self.lasty[slot] = x, y
+        self.xvel[slot], self.yvel[slot] = xvel, yvel
+        self.angle[slot], self.spin[slot] = 0, spin
+        self.fall[slot], self.mass[slot] = 0, mass
+        self.live.append(slot)
+        return slot
+
+    def clear(self) -> None:
+        self.free += reversed(self.live)
+        self.live = []
+
+    # where bullets were before this tick, for drawing between ticks
+    def keep_last(self) -> None:
+        if numpy:
+            self.lastx[:], self.lasty[:] = self.x, self.y
+        else:
+            self.lastx[:], self.lasty[:] = self.x[:], self.y[:]
+
+    # applies gravity, moves and spins every bullet by scale of its velocity
+    # and spin, then frees the ones more than reach right of or below origin.
+    # returns the slots left
+    def step(self, gravity, tick_rate, scale, origin, reach) -> list[int]:
+        if not self.live:
+            return []
+        if numpy:
+            i = numpy.array(self.live)
+            self.fall[i] += 1
+            self.yvel[i] += self.fall[i] / tick_rate * gravity * self.mass[i] * scale
+            for pos, vel in [(self.x, self.xvel), (self.y, self.yvel)]:
+                moved = pos[i] + vel[i] * scale
+                pos[i] = numpy.trunc(moved + numpy.copysign(0.5, moved))
+            self.angle[i] = (self.angle[i] + self.spin[i] * scale) % 360
+            far = (self.x[i] - origin[0] > reach[0]) | (
+                self.y[i] - origin[1] > reach[1]
+            )
+            kept = [slot for slot, out in zip(self.live, far.tolist()) if not out]
+        else:
+            kept = []
+            for slot in self.live:
+                self.fall[slot] += 1
+                self.yvel[slot] += (
+                    self.fall[slot] / tick_rate * gravity * self.mass[slot] * scale
+                )
+                self.x[slot] = rounded(self.x[slot] + self.xvel[slot] * scale)
+                self.y[slot] = rounded(self.y[slot] + self.yvel[slot] * scale)
+                self.angle[slot] = (self.angle[slot] + self.spin[slot] * scale) % 360
+                if not (
+                    self.x[slot] - origin[0] > reach[0]
+                    or self.y[slot] - origin[1] > reach[1]
+                ):
+                    kept.append(slot)
+        if len(kept) < len(self.live):
+            self.free += set(self.live).difference(kept)
+            self.live = kept
+        return kept
+
+    def kill(self, slots) -> None:
+        if slots:
+            slots = set(slots)
+            self.live = [slot for slot in self.live if slot not in slots]
+            self.free += slots
@@ -0,0 +1,284 @@
+import pygame
+from collections import OrderedDict
+from math import cos, sin, pi
+
+
+# returns rotation of sprite by angle clockwise for each obj in sprites
+def rotate_image(sprites, angle) -> list[pygame.Surface]:
+    return [pygame.transform.rotate(sprite, angle) for sprite in sprites]
+
+
+# returns list of flipped sprite for each obj in sprites (list of surfaces)
+def flip_image(sprites) -> list[pygame.Surface]:
+    return [pygame.transform.flip(sprite, True, False) for sprite in sprites]
+
+
+# splits the top row of spritesheet into width x height frames. frames of
+# sheets with per pixel alpha are subsurfaces sharing the sheet's pixels
+def slice_frames(spritesheet, width, height) -> list[pygame.Surface]:
+    sprites, alpha = [], spritesheet.get_flags() & pygame.SRCALPHA
+    for i in range(spritesheet.get_width() // width):
+        rect = pygame.Rect(i * width, 0, width, height)
+        if alpha and spritesheet.get_rect().contains(rect):
+            sprites.append(spritesheet.subsurface(rect))
+            continue
+        surface = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        surface.blit(spritesheet, (0, 0), rect)
+        sprites.append(surface)
+    return sprites
+
+
+# bytes of pixel data held by a list of surfaces
+def surface_size(surfaces) -> int:
+    return sum(s.get_width() * s.get_height() * s.get_bytesize() for s in surfaces)
+
+
+# decodes each png once and keeps its sliced frames keyed by
+# (path, width, height, flip, angle), evicting least recently used
+# entries once the decoded pixels go over budget bytes (None = no limit).
+# pngs in packed (a PackedAtlas) are cut from it instead of loaded, and
+# rotations and masks are read from disk (a DiskCache) if it has them
+class AssetCache:
+    def __init__(self, budget=None, packed=None, disk=None) -> None:
+        self.budget, self.used, self.packed, self.disk = budget, 0, packed, disk
+        self.entries = OrderedDict()  # key: (surfaces, size)
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+        self.misses += 1
+        return None
+
+    def put(self, key, surfaces, size=None) -> list[pygame.Surface]:
+        size = surface_size(surfaces) if size is None else size
+        if key in self.entries:
+            self.used -= self.entries.pop(key)[1]
+        self.entries[key] = (surfaces, size)
+        self.used += size
+        while self.budget is not None and self.used > self.budget:
+            if len(self.entries) == 1:
+                break  # always keep what was just asked for
+            self.used -= self.entries.popitem(last=False)[1][1]
+            self.evictions += 1
+        return surfaces
+
+    # whole decoded sheet
+    def sheet(self, path) -> pygame.Surface:
+        key = (path, None, None, False, 0)
+        cached = self.get(key)
+        if cached is None:
+            if self.packed is not None and path in self.packed:
+                image = self.packed.region(path)
+            else:
+                image = pygame.image.load(path).convert_alpha()
+            cached = self.put(key, [image])
+        return cached[0]
+
+    # frames of the sheet at path, each width x height, flipped then rotated
+    def frames(self, path, width, height, flip=False, angle=0) -> list:
+        key = (path, width, height, flip, angle % 360)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if angle % 360:
+            sprites = None
+            if self.disk is not None:
+                sprites = self.disk.images(path, width, height, flip, angle)
+            if sprites is not None:  # raw RGBA, made blittable like loaded pngs
+                sprites = [sprite.convert_alpha() for sprite in sprites]
+            else:
+                sprites = rotate_image(self.frames(path, width, height, flip), angle)
+        elif flip:
+            sprites = flip_image(self.frames(path, width, height))
+        else:
+            sprites = slice_frames(self.sheet(path), width, height)
+        return self.put(key, sprites)
+
+    # collision masks of frames(path, width, height, flip, angle)
+    def masks(self, path, width, height, flip=False, angle=0) -> list:
+        key = (path, width, height, flip, angle % 360, "masks")
+        cached = self.get(key)
+        if cached is None:
+            masks = None
+            if self.disk is not None:
+                masks = self.disk.masks(path, width, height, flip, angle)
+            if masks is None:
+                frames = self.frames(path, width, height, flip, angle)
+                masks = [pygame.mask.from_surface(frame) for frame in frames]
+                if self.disk is not None:
+                    self.disk.put(path, width, height, flip, angle, frames, masks)
+            cached = self.put(key, masks, sum(width * height // 8 for _ in masks))
+        return cached
+
+    # rotations of the first frame of the sheet at path, see RotationAtlas.
+    # lazy ones are budgeted as if every rotation was the size of the frame
+    def atlas(self, path, width=None, height=None, steps=360, lazy=False):
+        key = (path, width, height, "atlas", steps)
+        cached = self.get(key)
+        if cached is None:
+            if width is None:
+                base = self.sheet(path)
+            else:
+                base = self.frames(path, width, height)[0]
+            atlas = RotationAtlas(base, steps, lazy)
+            size = surface_size([base]) * steps if lazy else surface_size(atlas.images)
+            cached = self.put(key, atlas, size)
+        return cached
+
+    # frames(path, width, height, flip, angle) can be made without loading a
+    # png: they're cached, rotated ones are on disk, or the sheet is packed
+    def ready(self, path, width, height, flip=False, angle=0) -> bool:
+        if (path, width, height, flip, angle % 360) in self.entries:
+            return True
+        if angle % 360:
+            if self.disk is not None and self.disk.has(
+                path, width, height, flip, angle
+            ):
+                return True
+            return self.ready(path, width, height, flip)
+        if flip:
+            return self.ready(path, width, height)
+        if (path, None, None, False, 0) in self.entries:
+            return True
+        return self.packed is not None and path in self.packed
+
+    # the sprites, as passed to decode, whose frames or masks would need a png
+    # loaded, and the pages of packed sheets that aren't loaded yet
+    def missing(self, sprites) -> set[tuple]:
+        missing = set()
+        for path, width, height, angle, *flip in sprites:
+            flip = bool(flip and flip[0])
+            if self.packed is not None and path in self.packed:
+                page = self.packed.unloaded(path)
+                if page is not None:
+                    missing.add((page, None, None, 0))
+            if width is None:
+                if not self.ready(path, None, None):
+                    missing.add((path, width, height, angle, flip))
+                continue
+            masks = (path, width, height, flip, angle % 360, "masks") in self.entries
+            if self.disk is not None and not masks:
+                masks = self.disk.has(path, width, height, flip, angle)
+            if not (masks and self.ready(path, width, height, flip, angle)):
+                missing.add((path, width, height, angle, flip))
+        return missing
+
+    # stores what decode returned, converting the sheets and frames for the
+    # display, and the pages of packed. has to run on the main thread
+    def adopt(self, decoded) -> None:
+        packed = self.packed
+        for key, value in decoded.items():
+            if key in self.entries:
+                continue
+            if packed is not None and key[0] in packed.files:
+                packed.adopt(key[0], value[0])
+            elif packed is not None and key[0] in packed and key[3:] == (False, 0):
+                continue  # the sheet and its unflipped frames, cut from packed
+            elif key[1] is None:
+                self.put(key, [value[0].convert_alpha()])
+            elif key[-1] == "masks":
+                self.put(key, value, sum(key[1] * key[2] // 8 for _ in value))
+                if self.disk is not None and self.disk.masks(*key[:5]) is None:
+                    frames = decoded[key[:5]]
+                    self.disk.put(*key[:5], frames, value)
+            else:
+                self.put(key, [frame.convert_alpha() for frame in value])
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.used,
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.used = 0
+
+    # writes out rotations and masks made since the last save
+    def save(self) -> None:
+        if self.disk is not None:
+            self.disk.save()
+
+
+# image rotated to steps evenly spaced angles, with the matching masks
+# and the offset needed to keep the rotated image centered
+# lazy only rotates to an angle the first time it's asked for
+class RotationAtlas:
+    def __init__(self, image, steps=360, lazy=False) -> None:
+        self.image, self.steps = image, steps
+        self.images, self.masks, self.offsets = (
+            [None] * steps,
+            [None] * steps,
+            [0] * steps,
+        )
+        if not lazy:
+            for i in range(steps):
+                self.rotate(i)
+
+    def rotate(self, i) -> None:
+        angle = i * 360 / self.steps
+        rads = (angle / 360 * 2 * pi) % (pi / 2)
+        rotated = pygame.transform.rotate(self.image, angle)
+        self.images[i] = rotated
+        self.masks[i] = pygame.mask.from_surface(rotated)
+        self.offsets[i] = self.image.get_width() / 2 * (cos(rads) + sin(rads) - 1)
+
+    def index(self, angle) -> int:
+        return round(angle * self.steps / 360) % self.steps
+
+    # image, mask, rotation offset
+    def get(self, angle) -> tuple[pygame.Surface, pygame.mask.Mask, float]:
+        i = self.index(angle)
+        if self.images[i] is None:
+            self.rotate(i)
+        return self.images[i], self.masks[i], self.offsets[i]
+
+
+# loads, slices, flips, rotates and makes masks for each (path, width,
+# height, angle) or (path, width, height, angle, flip) in sprites without
+# touching a cache or the display, so it can run in a worker thread. a width
+# of None only loads the sheet. AssetCache.adopt takes the result
+def decode(sprites) -> dict:
+    sheets, decoded = {}, {}
+    for path, width, height, angle, *flip in sprites:
+        flip = bool(flip and flip[0])
+        if (path, width, height, flip, angle % 360, "masks") in decoded:
+            continue
+        if path not in sheets:
+            sheets[path] = pygame.image.load(path)
+            decoded[(path, None, None, False, 0)] = [sheets[path]]
+        if width is None:
+            continue
+        key = (path, width, height, False, 0)
+        if key not in decoded:
+            decoded[key] = slice_frames(sheets[path], width, height)
+        frames = decoded[key]
+        if flip:
+            key = (path, width, height, True, 0)
+            if key not in decoded:
+                decoded[key] = flip_image(frames)
+            frames = decoded[key]
+        if angle % 360:
+            frames = rotate_image(frames, angle)
+            decoded[(path, width, height, flip, angle % 360)] = frames
+        masks = [pygame.mask.from_surface(frame) for frame in frames]
+        decoded[(path, width, height, flip, angle % 360, "masks")] = masks
+    return decoded
+
+
+# what load_sprite_sheets returns, but each sheet is only decoded by its
+# loader the first time it's looked up
+class LazySheets(dict):
+    def __init__(self, loaders) -> None:
+        super().__init__()
+        self.loaders = loaders
+
+    def __missing__(self, name) -> list:
+        self[name] = self.loaders[name]()
+        return self[name]
@@ -0,0 +1,164 @@
+import hashlib
+import mmap
+import os
+import re
+import struct
+from os.path import isfile, join
+import pygame
+
+# mask and rotation cache file:
+#   header:  magic, version, entry count
+#   entries: sha1 of the png, frame width, height, flip, angle, frame count,
+#            then per frame its size and where its pixels and rects are
+#   data:    RGBA pixels of rotated frames, and (x, y, w, h) rects whose union
+#            is each frame's mask
+# entries are keyed by the png's contents, so editing a png misses the cache
+
+MAGIC, VERSION = b"PMSK", 1
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<20sHHBHH")
+FRAME = struct.Struct("<HHIIII")  # width, height, pixels at, length, rects at, count
+RECT = struct.Struct("<4H")
+RUNS = re.compile(b"\x01+")
+FILLED = {}  # (width, height): filled mask, for rebuilding masks from rects
+
+
+# rects covering exactly the set bits of mask, rows of the same runs merged
+def mask_rects(mask) -> list[tuple[int, int, int, int]]:
+    w, h = mask.get_size()
+    surface = mask.to_surface(setcolor=(1, 1, 1, 255), unsetcolor=(0, 0, 0, 255))
+    bits = pygame.image.tobytes(surface, "RGBA")[::4]
+    rects, started = [], {}  # run: row it started on
+    for y in range(h + 1):
+        row = bits[y * w : (y + 1) * w]
+        runs = {match.span() for match in RUNS.finditer(row)}
+        for run in [run for run in started if run not in runs]:
+            top = started.pop(run)
+            rects.append((run[0], top, run[1] - run[0], y - top))
+        for run in runs:
+            started.setdefault(run, y)
+    return rects
+
+
+def rebuild_mask(size, rects) -> pygame.mask.Mask:
+    mask = pygame.mask.Mask(size)
+    for x, y, w, h in rects:
+        if (w, h) not in FILLED:
+            FILLED[(w, h)] = pygame.mask.Mask((w, h), fill=True)
+        mask.draw(FILLED[(w, h)], (x, y))
+    return mask
+
+
+# rotated frames and masks of the pngs under root, kept in a file between
+# runs. reads memory map the file, new entries are written out by save
+class DiskCache:
+    def __init__(self, path, root) -> None:
+        self.path, self.root, self.map, self.changed = path, root, None, False
+        self.entries = {}  # key: [(width, height, pixels, rects)]
+        self.digests = {}  # png path: sha1 of its contents
+        if isfile(path):
+            self.load()
+
+    def load(self) -> None:
+        with open(self.path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            self.map = None
+            return None
+        pos = HEADER.size
+        for _ in range(count):
+            *key, frames = ENTRY.unpack_from(self.map, pos)
+            pos += ENTRY.size
+            self.entries[tuple(key)] = [
+                FRAME.unpack_from(self.map, pos + FRAME.size * i) for i in range(frames)
+            ]
+            pos += FRAME.size * frames
+
+    def digest(self, path) -> bytes:
+        if path not in self.digests:
+            with open(path, "rb") as file:
+                self.digests[path] = hashlib.sha1(file.read()).digest()
+        return self.digests[path]
+
+    def key(self, path, width, height, flip, angle) -> tuple:
+        return (self.digest(path), width, height, int(flip), angle % 360)
+
+    # bytes of a frame's pixels and its packed rects
+    def data(self, frame) -> tuple[bytes, bytes]:
+        width, height, pixels, length, rects, count = frame
+        if type(pixels) is bytes:
+            return pixels, rects
+        end = rects + count * RECT.size
+        return self.map[pixels : pixels + length], self.map[rects:end]
+
+    # has the masks, and the frames if they're rotated
+    def has(self, path, width, height, flip=False, angle=0) -> bool:
+        return self.key(path, width, height, flip, angle) in self.entries
+
+    # cached frames of a rotated sheet, or None
+    def images(self, path, width, height, flip=False, angle=0) -> list:
+        frames = self.entries.get(self.key(path, width, height, flip, angle))
+        if not frames or not frames[0][3]:
+            return None
+        images = []
+        for frame in frames:
+            pixels = self.data(frame)[0]
+            images.append(pygame.image.frombytes(pixels, frame[:2], "RGBA"))
+        return images
+
+    def masks(self, path, width, height, flip=False, angle=0) -> list:
+        frames = self.entries.get(self.key(path, width, height, flip, angle))
+        if frames is None:
+            return None
+        masks = []
+        for frame in frames:
+            rects = self.data(frame)[1]
+            masks.append(rebuild_mask(frame[:2], list(RECT.iter_unpack(rects))))
+        return masks
+
+    # keeps the masks of frames, and the frames themselves if they're rotated
+    def put(self, path, width, height, flip, angle, frames, masks) -> None:
+        entry = []
+        for frame, mask in zip(frames, masks):
+            pixels = pygame.image.tobytes(frame, "RGBA") if angle % 360 else b""
+            rects = mask_rects(mask)
+            packed = b"".join(RECT.pack(*rect) for rect in rects)
+            entry.append((*frame.get_size(), pixels, len(pixels), packed, len(rects)))
+        self.entries[self.key(path, width, height, flip, angle)] = entry
+        self.changed = True
+
+    # writes every entry to the file if any were added, dropping ones of
+    # pngs under root that have been edited or removed since they were cached
+    def save(self) -> None:
+        if not self.changed:
+            return None
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".png"):
+                    self.digest(join(folder, name))
+        current = set(self.digests.values())
+        entries = {k: frames for k, frames in self.entries.items() if k[0] in current}
+        pos = HEADER.size + sum(
+            ENTRY.size + FRAME.size * len(frames) for frames in entries.values()
+        )
+        index, data = [HEADER.pack(MAGIC, VERSION, len(entries))], []
+        for key, frames in entries.items():
+            index.append(ENTRY.pack(*key, len(frames)))
+            for frame in frames:
+                pixels, rects = self.data(frame)
+                count = len(rects) // RECT.size
+                index.append(
+                    FRAME.pack(*frame[:2], pos, len(pixels), pos + len(pixels), count)
+                )
+                data += [pixels, rects]
+                pos += len(pixels) + len(rects)
+        temp = f"{self.path}.{os.getpid()}"
+        with open(temp, "wb") as file:
+            file.write(b"".join(index + data))
+        if self.map is not None:
+            self.map.close()
+        os.replace(temp, self.path)
+        self.entries, self.changed = {}, False
+        self.load()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os.path import join
+from statistics import mean, quantiles
+import headless
+import game
+
+
+# plays one level headless in a worker process. job is (name, level, inputs,
+# ticks) where inputs is None to stand still for ticks, or a trace file
+def run(job) -> dict:
+    name, level_num, inputs, ticks = job
+    seed = None
+    if inputs is None:
+        inputs = headless.idle(ticks)
+    elif type(inputs) is str:
+        level_num, inputs, seed = headless.load_trace(inputs)
+    result = {"name": name, "level": level_num}
+    try:
+        states = headless.simulate(level_num, inputs, until_goal=True, seed=seed)
+    except Exception as error:
+        return result | {"error": repr(error)}
+    times = [state["time"] for state in states]
+    return result | {
+        "goal": bool(states) and states[-1]["level"] != level_num,
+        "ticks": len(states),
+        "deaths": states[-1]["deaths"] if states else {},
+        "mean": mean(times) if times else 0,
+        "p95": quantiles(times, n=20)[-1] if len(times) > 1 else sum(times),
+        "max": max(times, default=0),
+        "times": times,
+    }
+
+
+# every level idle for ticks ticks, or every trace in traces
+def jobs(traces, ticks) -> list[tuple]:
+    if traces is None:
+        return [(f"level {n}", n, None, ticks) for n in range(1, len(game.LEVELS) + 1)]
+    names = sorted(f for f in os.listdir(traces) if f.endswith((".json", ".trace")))
+    return [(name, None, join(traces, name), ticks) for name in names]
+
+
+def report(result) -> str:
+    if "error" in result:
+        return f"{result['name']:<24} ERROR {result['error']}"
+    deaths = result["deaths"]
+    return (
+        f"{result['name']:<24} {'goal' if result['goal'] else '    '}"
+        f" {result['ticks']:>6} ticks  {deaths['spike']:>3} spike"
+        f" {deaths['fall']:>3} fall  {result['mean'] * 1000:7.3f}ms mean"
+        f" {result['p95'] * 1000:7.3f}ms p95 {result['max'] * 1000:7.3f}ms max"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="run levels headless on all cores")
+    parser.add_argument("--traces", help="directory of traces to replay")
+    parser.add_argument("--ticks", type=int, default=600, help="ticks per level")
+    parser.add_argument("--workers", type=int, help="processes, default all cores")
+    parser.add_argument("--out", help="json file to write results to")
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        results = list(pool.map(run, jobs(args.traces, args.ticks)))
+    for result in results:
+        print(report(result))
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(results, file)
+    if any("error" in result for result in results):
+        raise SystemExit(1)
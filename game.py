@@ -0,0 +1,982 @@
+from time import perf_counter
+
+started = perf_counter()  # startup is timed from here
+import os
+import pygame
+from levelfile import LevelFile
+from cache import AssetCache, LazySheets
+from loader import Loader
+from manifest import Manifest
+from atlas import open_atlas
+from diskcache import DiskCache
+from spatial import Level, StreamedLevel, cast, nearby, mask_box, solid_rect, sweep
+from render import StaticLayer
+from replay import Recorder, load as load_trace
+from overlay import Profiler
+from bullets import BulletPool
+from store import ObjectStore, StoredObject
+from tiles import merge_tiles
+from os.path import getmtime, isfile, join
+from random import Random, randint
+from cProfile import Profile
+from math import floor, ceil, sqrt
+
+startup = [("start", started), ("imports", perf_counter())]  # (step, time done)
+
+CAPTION = "monochrome"
+CHARACTER = "plus"
+ICON = "goal"
+
+ANIM_DELAY = 7  # 60ths of a second each frame of the player is shown
+WIDTH = 1000
+HEIGHT = 800
+DIMS = [WIDTH, HEIGHT]
+FPS = 60  # frames drawn per second
+# physics updates per second. speeds are in pixels per 60th of a second and
+# other rates per 60th too, each tick applies STEP of them
+TICK_RATE = 60
+STEP = 60 / TICK_RATE
+MAX_TICKS = 5  # most physics updates per frame before the game slows down
+
+MSPEED = 15  # max ground speed
+AGILE = 4  # ability to change direction
+JUMP = 20
+FRICTION = 0.5
+STOP = 1
+TVEL = 60  # max falling speed
+SCROLL = [250, 175]  # distance from side of screen to scroll x, y
+RESP_BUFFER = 0.15  # secs before player goes back to start after dying
+BOUNCE_STRENGTH = 30  # amount bouncepads bounce
+PAD_DELAY = 2  # 60ths of a second each frame of a bouncing bouncepad is shown
+ASSET_BUDGET = None  # max bytes of decoded sprites kept cached, None for no limit
+ROTATIONS = 360  # angles precomputed for gun and bullet sprites
+GRID_CELL = 64  # size of the squares objects are indexed by for collisions
+CHUNK = 512  # size of the surfaces unchanging objects are pre-drawn onto
+STREAM = False  # only build the objects in level chunks near the player
+MERGE_TILES = ["block"]  # touching solid objects of these are joined when loading
+STREAM_CHUNKS = 64  # most chunks kept built when streaming
+PRELOAD = True  # decode the next level's sprites in the background
+LOAD_WORKERS = 4  # threads decoding pngs at the same time when loading
+LAZY = False  # decode player, gun and bullet sprites when first shown, not up front
+STARTUP_TIMES = False  # print how long each step of starting the game took
+# "mask" moves the player pixel by pixel testing masks, "swept" finds where it
+# hits rectangular objects in one go and only mask tests the other objects
+COLLISION = "mask"
+# coral = (255, 96, 96)
+# lime = (196, 255, 14)
+BGCOLOR = "random"
+LOAD_BAR = (255, 255, 255)  # loading screen progress bar
+
+# reload(ticks), recoil(fraction of bullet_speed), bullet_speed, bullet_mass, perception, damage
+STATS = [10, 0.3, 20, 0.3, 0.7, 1]
+GUN = "goon"
+AMMO = "sus"
+
+level_num = 2
+
+# x_vel is velocity to the right
+# y_vel is velocity down
+
+# pygame.Surface needs SRCALPHA as 2nd param
+
+PATH = "assets"
+LEVEL_FILE = "levels.bin"  # compiled levels, made by running levelfile.py
+MANIFEST = join(PATH, "manifest.json")  # asset list made by running manifest.py
+ATLAS = "atlas"  # sprites packed by atlas.py, used while the pngs are unchanged
+MASK_CACHE = "masks.cache"  # rotations and masks kept between runs, None for off
+RECORD = None  # file to save every tick's input to, eg "run.trace"
+REPLAY = None  # trace file to play back instead of reading input
+# on quit, save every frame's timings to a .csv file or cProfile stats to any
+# other file, eg "run.prof". F3 shows the timings in game either way
+PROFILE = None
+FILES = Manifest(PATH, MANIFEST)  # lists folders itself if there's no manifest
+
+ICON = join("objects", ICON + ".png")
+
+# compiled levels are only read if level.py hasn't been edited since
+LEVELS = None
+if isfile(LEVEL_FILE) and getmtime(LEVEL_FILE) >= getmtime("level.py"):
+    try:
+        LEVELS = LevelFile(LEVEL_FILE)
+    except ValueError:  # compiled by an older version
+        pass
+if LEVELS is None:
+    from level import LEVELS
+startup.append(("levels", perf_counter()))
+
+DISK = DiskCache(MASK_CACHE, PATH) if MASK_CACHE else None
+ASSETS = AssetCache(ASSET_BUDGET, open_atlas(ATLAS), DISK)
+LOADER = Loader(LOAD_WORKERS)
+wd, headless = None, False  # window, set by open_window
+pressed, clicking = None, False  # keys held and left mouse button, every tick
+redraw = False  # whole screen needs drawing again, eg after going fullscreen
+upcoming = None  # LOADER job decoding the sprites of the next level
+profiler = Profiler(FPS)
+profiling = False  # taking laps, checked before every profiler call
+rng = Random()  # everything random that changes how a level plays, seeded by traces
+
+
+# position fraction alpha of the way from last to now
+def lerp(last, now, alpha) -> list[float]:
+    return [last[i] + (now[i] - last[i]) * alpha for i in range(len(now))]
+
+
+# headless runs without a window, only a 1x1 surface for converting sprites
+def open_window(run_headless=False) -> pygame.Surface:
+    global wd, headless
+    headless = run_headless
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pygame.init()
+    startup.append(("pygame.init", perf_counter()))
+    if headless:
+        wd = pygame.display.set_mode((1, 1))
+        return wd
+    wd = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(CAPTION)
+    pygame.display.set_icon(pygame.image.load(join(PATH, ICON)))
+    startup.append(("window", perf_counter()))
+    return wd
+
+
+def print_startup() -> None:
+    print("startup:")
+    for (_, last), (step, done) in zip(startup, startup[1:]):
+        print(f"  {step:<14} {(done - last) * 1000:8.1f}ms")
+    print(f"  {'total':<14} {(startup[-1][1] - startup[0][1]) * 1000:8.1f}ms")
+
+
+def random_color():
+    return tuple([rng.randint(0, 255) for _ in range(3)])
+
+
+# frames of a single sheet, shared with every other user of the same sheet
+def load_sprite(path, name, width, height, angle=0) -> list[pygame.Surface]:
+    return ASSETS.frames(join(path, name + ".png"), width, height, False, angle)
+
+
+# masks of the frames load_sprite returns
+def load_mask(path, name, width, height, angle=0) -> list[pygame.mask.Mask]:
+    return ASSETS.masks(join(path, name + ".png"), width, height, False, angle)
+
+
+# masks=True gives the mask of each frame instead of the frame. lazy=True
+# only decodes each sheet the first time it's looked up
+def load_sprite_sheets(
+    path, width, height, flip=False, masks=False, lazy=False
+) -> dict[str : list[pygame.Surface]]:
+    load = ASSETS.masks if masks else ASSETS.frames
+    loaders = {}
+    for image in FILES.files(path):
+        file = join(path, image)
+        name = image.replace(".png", "")
+        if flip:
+            loaders[name + "_right"] = lambda file=file: load(file, width, height)
+            loaders[name + "_left"] = lambda file=file: load(file, width, height, True)
+        else:
+            loaders[name] = lambda file=file: load(file, width, height)
+    if lazy:
+        return LazySheets(loaders)
+    return {name: loader() for name, loader in loaders.items()}
+
+
+# builds the object for one entry of a level, [space, name, path/angle, angle],
+# into store
+def make_object(obj, store):
+    args = len(obj)
+    if args == 3 and type(obj[2]) is list:
+        return Merged(store, obj[0], obj[1], obj[2])
+    elif obj[1] == "bouncepad":
+        if args == 2:
+            return Bouncepad(store, obj[0])
+        elif args == 3:
+            return Bouncepad(store, obj[0], obj[2])
+        elif args == 4:
+            return Bouncepad(store, obj[0], obj[2], obj[3])
+    elif obj[1] == "target":
+        if args == 2:
+            return Target(store, obj[0])
+        elif args == 3:
+            return Target(store, obj[0], obj[2])
+        elif args == 4:
+            return Target(store, obj[0], obj[2], obj[3])
+    elif obj[1] == "spike":
+        if args == 2:
+            return Object(store, obj[0], obj[1])
+        elif args == 3:
+            return Object(store, obj[0], obj[1], None, obj[2])
+        elif args == 4:
+            return Object(store, obj[0], obj[1], obj[2], obj[3])
+    else:
+        if args == 2:
+            return Object(store, obj[0], obj[1])
+        elif args == 3:
+            return Object(store, obj[0], obj[1], obj[2])
+        elif args == 4:
+            return Object(store, obj[0], obj[1], obj[2], obj[3])
+
+
+# entry is an object in MERGE_TILES whose sprite fills its rect
+def solid_tile(obj) -> bool:
+    if obj[1] not in MERGE_TILES:
+        return False
+    path, width, height, angle = tile_sprite(obj)
+    mask = load_mask(join(PATH, "objects"), path, width, height, angle)[0]
+    return mask.get_size() == (width, height) and mask.count() == width * height
+
+
+# path, width, height and angle of the sprite of an entry made into an Object
+def tile_sprite(obj) -> tuple[str, int, int, int]:
+    path, angle = object_sprite(obj[0], obj[1], *obj[2:])
+    return path, obj[0][2], obj[0][3], angle
+
+
+# index in store of the frames and masks of an object sprite
+def object_look(store, path, width, height, angle=0) -> int:
+    space = [join(PATH, "objects"), path, width, height, angle]
+    return store.look_of(
+        (path, width, height, angle), lambda: (load_sprite(*space), load_mask(*space))
+    )
+
+
+# path and angle of the sprite Object(space, name, path, angle) shows
+def object_sprite(space, name, path=None, angle=0) -> tuple[str, int]:
+    if name == "block" and path is None:
+        path = f"block{space[2]//64}x{space[3]//64}"
+    path = name if path is None else path
+    if type(path) is int:
+        angle, path = path, name
+    return path, angle
+
+
+# (file, width, height, angle) of every sprite the objects of level use
+def level_sprites(level) -> set[tuple]:
+    sprites = set()
+    for obj in level[1:]:
+        space, name, args = obj[0], obj[1], obj[2:]
+        if name == "bouncepad":
+            angle = args[0] if args else 0
+            path = args[1] if len(args) > 1 else "bouncepad"
+            paths = [("bouncepad", 0), (path, angle)]
+        elif name == "target":
+            targets = args[1] if len(args) > 1 else ["target", "target_shot"]
+            paths = [(targets[0], 0), (targets[1], 0)]
+        elif name == "spike" and len(args) == 1:
+            paths = [object_sprite(space, name, None, args[0])]
+        else:
+            paths = [object_sprite(space, name, *args)]
+        for path, angle in paths:
+            file = join(PATH, "objects", path + ".png")
+            sprites.add((file, space[2], space[3], angle))
+    return sprites
+
+
+# (file, width, height, angle, flip) of the player's sprites, its gun's sheet
+# and its bullet
+def player_sprites() -> set[tuple]:
+    folder = join(PATH, "characters", CHARACTER)
+    sprites = {(join(PATH, "guns", GUN + ".png"), None, None, 0)}
+    sprites.add((join(PATH, "bullets", AMMO + ".png"), 64, 64, 0))
+    for image in FILES.files(folder):
+        sprites |= {(join(folder, image), 128, 128, 0, flip) for flip in [0, 1]}
+    return sprites
+
+
+# starts decoding the sprites of the level after level_num in the background
+def preload(level_num):
+    if not PRELOAD or headless or level_num >= len(LEVELS):
+        return None
+    return LOADER.start(ASSETS.missing(level_sprites(LEVELS[level_num])))
+
+
+# loads level_num, using its preloaded sprites if they're done decoding, else
+# waiting for them behind the loading screen
+def next_level(level_num):
+    global upcoming
+    job, upcoming = upcoming, None
+    ready = job is not None and job.done()
+    if ready:
+        ASSETS.adopt(job.result())
+    loading = not (ready or headless)
+    level = process_levels(LEVELS[level_num - 1], BGCOLOR, loading, job)
+    upcoming = preload(level_num)
+    return level
+
+
+# loading screen on back, with a bar filled to progress (0 to 1) under it
+def draw_loading(back, progress) -> None:
+    pos = (WIDTH // 2 - 128, HEIGHT // 2 - 32)
+    wd.fill(back)
+    wd.blit(load_sprite(join(PATH, "load"), "load", 256, 64)[0], pos)
+    wd.fill(LOAD_BAR, (pos[0], pos[1] + 72, round(256 * progress), 8))
+    pygame.display.update()
+    pygame.event.pump()  # keeps the window responding
+
+
+# loading decodes the level's sprites, and the player's unless LAZY, on
+# LOADER's threads, or waits for job to, showing the loading screen meanwhile.
+# otherwise sprites are loaded as the objects ask for them
+def process_levels(level, color, loading=True, job=None):
+    if loading:
+        back = [randint(0, 255) for _ in range(3)]
+        if job is None:
+            sprites = level_sprites(level)
+            if not LAZY:  # else they're decoded when first shown
+                sprites |= player_sprites()
+            job = LOADER.start(ASSETS.missing(sprites))
+        ASSETS.adopt(job.wait(lambda progress: draw_loading(back, progress), 1 / FPS))
+    color = random_color() if color == "random" else color
+    store, entries = ObjectStore(), level[1:]
+    if MERGE_TILES:
+        entries = merge_tiles(entries, solid_tile)
+    if STREAM:
+        build = lambda obj: make_object(obj, store)
+        objects = StreamedLevel(entries, build, GRID_CELL, CHUNK, STREAM_CHUNKS)
+        objects.layer = StaticLayer([], color, CHUNK)
+    else:
+        objects = Level([make_object(obj, store) for obj in entries], GRID_CELL)
+        static = [obj for obj in objects if not obj.dynamic]
+        objects.layer = StaticLayer(static, color, CHUNK)
+    ASSETS.save()
+    return level[0], objects, color
+
+
+# parts of the level that have to be loaded when streaming: what's on screen,
+# and everything the player or its bullets could hit soon
+def active_area(player) -> list[pygame.Rect]:
+    view = pygame.Rect(t_offset, DIMS).inflate(CHUNK, CHUNK)
+    area = [view, player.rect.inflate(CHUNK, CHUNK)]
+    return area + [bullet.rect.inflate(CHUNK, CHUNK) for bullet in player.bullets]
+
+
+class Player(pygame.sprite.Sprite):
+    def __init__(self, start, stats, gun, bullet, w, h) -> None:
+        super().__init__()
+        self.SPRITES = load_sprite_sheets(
+            join(PATH, "characters", CHARACTER), w, h, True, lazy=LAZY
+        )
+        self.MASKS = load_sprite_sheets(
+            join(PATH, "characters", CHARACTER), w, h, True, True, LAZY
+        )
+        self.float_rect = [start[0], start[1], w, h]
+        self.xvel, self.yvel = 0, 0
+        self.mask, self.direction, self.walking = None, "right", False
+        self.fallcount, self.animcount = 0, 0
+        self.hit_count, self.loaded = 0, 0
+        self.stats, self.bullets = stats, BulletPool(Bullet)
+        self.gun, self.bullet = gun, bullet
+        self.collide = [None] * 4
+        self.deaths = {"spike": 0, "fall": 0}  # respawns from spikes, out of bounds
+        self.update_sprite()
+        self.respawn(start)
+
+    def update_sprite(self) -> None:
+        sprite_sheet = "idle"
+        if self.hit_count:
+            sprite_sheet = "hit"
+        elif self.yvel < 0:
+            sprite_sheet = "jump"
+        elif self.yvel > gravity:
+            sprite_sheet = "fall"
+        elif self.xvel != 0:
+            sprite_sheet = "run"
+
+        sprites = self.SPRITES[sprite_sheet + "_" + self.direction]
+        frame = (self.animcount // round(ANIM_DELAY / STEP)) % len(sprites)
+        self.image = sprites[frame]
+        self.mask = self.MASKS[sprite_sheet + "_" + self.direction][frame]
+        self.animcount += 1
+        self.update()
+
+    def update(self) -> None:
+        self.rect = self.image.get_rect(
+            topleft=tuple([round(self.float_rect[i]) for i in [0, 1]])
+        )
+
+    def draw(self, alpha=1) -> pygame.Rect:
+        pos = lerp(self.last, self.float_rect[:2], alpha)
+        image_pos = [pos[i] - t_offset[i] for i in [0, 1]]
+        drawn = wd.blit(self.image, [floor(image_pos[i]) for i in [0, 1]])
+        return drawn.union(
+            wd.blit(
+                self.gun_image,
+                [floor(image_pos[i] - self.rotation_offset) for i in [0, 1]],
+            )
+        )
+
+    def respawn(self, start) -> list[float, float]:
+        self.float_rect[0], self.float_rect[1] = start
+        self.last = list(start)
+        global offset, look_offset, t_offset, last_offset
+        offset = [
+            self.float_rect[i] + (self.float_rect[i + 2] - DIMS[i]) // 2 for i in [0, 1]
+        ]
+        look_offset = [WIDTH / 2, HEIGHT / 2]
+        t_offset = [offset[i] + look_offset[i] for i in [0, 1]]
+        last_offset = t_offset
+        self.collide, self.fallcount = [None] * 4, 1
+        self.xvel, self.yvel = 0, 0
+        self.bullets.clear()
+        self.update()
+
+    def loop(self, fps, objects, data) -> list[float, float]:
+        self.adjust_speed()
+        # collision moves the player by its velocity, so by STEP of it a tick
+        self.xvel, self.yvel = self.xvel * STEP, self.yvel * STEP
+        self.collision(objects)
+        self.xvel, self.yvel = self.xvel / STEP, self.yvel / STEP
+        self.update_sprite()
+        self.shoot(objects)
+
+        if self.hit_count:
+            self.hit_count += 1
+        if self.hit_count > fps * RESP_BUFFER:
+            self.hit_count = 0
+            self.deaths["spike"] += 1
+            self.respawn(data[0])
+        elif not (data[1][0] <= self.float_rect[1] <= data[1][1]):
+            self.deaths["fall"] += 1
+            self.respawn(data[0])
+
+    def adjust_speed(self) -> None:
+        if not self.walking:
+            if self.xvel != 0:
+                self.xvel *= FRICTION**STEP
+            if -STOP <= self.xvel <= STOP:
+                self.xvel = 0
+        self.walking = False
+
+        self.yvel = (
+            TVEL if self.yvel > TVEL else -TVEL if self.yvel < -TVEL else self.yvel
+        )
+
+        self.fallcount += 1
+        if not ((self.collide[2] and gravity < 0) or (self.collide[3] and gravity > 0)):
+            self.yvel += (self.fallcount / TICK_RATE) * gravity * STEP  # gravity
+
+    # adds a bullet flying from the player towards the mouse, returns its slot
+    def fire(self) -> int:
+        speed = self.stats[2]
+        spin = rng.randint(int(0.4 * speed), int(2 * speed))
+        center = [self.float_rect[i] + self.float_rect[i + 2] / 2 for i in [0, 1]]
+        x_dist, y_dist = ((mouse[i] - center[i] + t_offset[i]) for i in [0, 1])
+        total_dist = sqrt(x_dist * x_dist + y_dist * y_dist)
+        if total_dist == 0:
+            return None
+        xvel, yvel = (speed * i / total_dist for i in [x_dist, y_dist])
+        pos = (self.rect.centerx - 32, self.rect.centery - 32)
+        return self.bullets.spawn(*pos, xvel, yvel, spin, self.stats[3])
+
+    def shoot(self, objs):
+        fired, bullets = None, self.bullets
+        if clicking and self.loaded >= 0:
+            fired = self.fire()
+        elif self.loaded < 0:
+            self.loaded += 1
+
+        # bullets out of perception range are dropped before colliding
+        reach = [i * 3 / 2 * self.stats[4] for i in DIMS]
+        moved = bullets.step(gravity, TICK_RATE, STEP, self.rect.topleft, reach)
+        hits = [slot for slot in moved if bullets.views[slot].loop(self, objs, fired)]
+        bullets.kill(hits)
+        if fired is not None:  # recoil from the new bullet's first move
+            push = self.stats[1] * self.stats[3]
+            self.xvel -= float(bullets.xvel[fired]) * push
+            self.yvel -= float(bullets.yvel[fired]) * push
+            self.loaded = -round(self.stats[0] / STEP)
+
+        center = [self.rect.centerx, self.rect.centery]
+        vector = [mouse[i] - center[i] + t_offset[i] for i in [0, 1]]
+        self.polar = pygame.Vector2(vector[0], vector[1]).as_polar()
+        self.angle = (-self.polar[1] + 360) % 360
+        atlas = ASSETS.atlas(
+            join(PATH, "guns", self.gun + ".png"), steps=ROTATIONS, lazy=LAZY
+        )
+        self.gun_image, _, self.rotation_offset = atlas.get(self.angle)
+
+    def collision(self, objects) -> None:
+        def add_incr(x, y) -> None:
+            self.float_rect[0] += x
+            self.float_rect[1] += y
+            self.update()
+
+        def try_direction(direction, obj) -> Object:
+            add_incr(direction[0], direction[1])
+            collided = has_collided(obj)
+            add_incr(-direction[0], -direction[1])
+            return obj if collided else None
+
+        def has_collided(obj) -> bool:
+            if obj.name == "layer":
+                return False
+            if profiling:
+                profiler.count("checks")
+            if COLLISION == "swept" and solid_rect(obj):
+                return hitbox().colliderect(solid_rect(obj))
+            return pygame.sprite.collide_mask(self, obj)
+
+        # player as a rect, the bounds of its mask
+        def hitbox() -> pygame.Rect:
+            return mask_box(self.mask).move(self.rect.topleft)
+
+        def try_mask(direction) -> bool:
+            orig_direction, self.direction = self.direction, direction
+            self.update_sprite()
+            for obj in objects:
+                if has_collided(obj):
+                    self.direction = orig_direction
+                    self.update_sprite()
+                    return False
+            return True
+
+        def stop(obj) -> None:
+            coll = [try_direction(i, obj) for i in axes]
+            self.collide = [
+                obj if (coll[i] and (direction[i // 2] in axes[i % 2])) else None
+                for i in range(4)
+            ]  # left, right, top, bottom
+            end()
+
+        def swept() -> None:
+            box = mask_box(self.mask)
+            box = [self.float_rect[i] + box[i] for i in [0, 1]] + list(box[2:])
+            solids = [(obj, solid_rect(obj)) for obj in objects]
+            others = [obj for obj, rect in solids if not rect and obj.name != "layer"]
+            solids = [
+                (obj, rect) for obj, rect in solids if rect and obj.name != "layer"
+            ]
+            vel = [self.xvel, self.yvel]
+            t, hit, axis = sweep(box, vel, [rect for _, rect in solids])
+            travel = [t * vel[i] for i in [0, 1]]
+            steps = ceil(max(abs(travel[0]), abs(travel[1])))
+            if others and steps:
+                incr = [travel[i] / steps for i in [0, 1]]
+                for _ in range(steps):
+                    add_incr(incr[0], incr[1])
+                    for obj in others:
+                        if has_collided(obj):
+                            add_incr(-incr[0], -incr[1])
+                            return stop(obj)
+            else:
+                add_incr(travel[0], travel[1])
+            if hit is None:
+                return end()
+            obj = solids[hit][0]
+            if has_collided(obj):  # rounded into it
+                back = [-direction[i] if i == axis else 0 for i in [0, 1]]
+                add_incr(back[0], back[1])
+            stop(obj)
+
+        def end() -> None:
+            for same in range(4):
+                if same_coll[same]:
+                    self.collide[same] = same_coll[same]
+            grain = min(STEP, 1)  # keeps the part of a pixel moved each tick
+            for i in range(4):
+                self.float_rect[i] = round(self.float_rect[i] / grain) * grain
+            if self.collide[0] or self.collide[1]:
+                self.xvel = 0
+            if self.collide[2] or self.collide[3]:
+                self.yvel = 0
+            if (self.collide[2] and gravity < 0) or (self.collide[3] and gravity > 0):
+                self.fallcount = 0
+            if self.xvel < 0:
+                try_mask("left")
+            elif self.xvel > 0:
+                try_mask("right")
+
+        reach = self.rect.union(self.rect.move(self.xvel, self.yvel))
+        objects = nearby(objects, reach.inflate(4, 4))
+        axes = [[-1, 0], [1, 0], [0, -1], [0, 1]]
+        for i in range(4):
+            changed_coll = False
+            if not self.collide[i]:
+                continue
+            for obj in objects:
+                if try_direction(axes[i], obj):
+                    self.collide[i] = obj
+                    changed_coll = True
+                    break
+            if not changed_coll:
+                self.collide[i] = None
+        fx, fy = ceil(abs(self.xvel)), ceil(abs(self.yvel))
+        max_speed, same_coll = fx if fx > fy else fy, [None] * 4
+        if max_speed == 0:
+            end()
+            return None
+        if self.xvel == 0:
+            same_coll[:1] = self.collide[:1]
+        if self.yvel == 0:
+            same_coll[1:] = self.collide[1:]
+        increment = [self.xvel / max_speed, self.yvel / max_speed]
+        direction = [abs(i) / i if i else 0 for i in [self.xvel, self.yvel]]
+        if COLLISION == "swept":
+            return swept()
+        for _ in range(max_speed):
+            add_incr(increment[0], increment[1])
+            for obj in objects:
+                if not has_collided(obj):
+                    continue
+
+                add_incr(-increment[0], -increment[1])
+                stop(obj)
+                return None
+        end()
+
+
+# one slot of the player's BulletPool, as drawing and collisions see it
+class Bullet(pygame.sprite.Sprite):
+    name = "bullet"
+
+    def __init__(self, pool, slot) -> None:
+        super().__init__()
+        self.pool, self.slot = pool, slot
+        self.rect = pygame.Rect(0, 0, 64, 64)
+        self.image, self.mask, self.rotation_offset = None, None, 0
+
+    def draw(self, alpha=1) -> pygame.Rect:
+        return wd.blit(*self.sprite(alpha))
+
+    # image and where on screen it goes
+    def sprite(self, alpha=1) -> tuple[pygame.Surface, tuple[float, float]]:
+        last = (self.pool.lastx[self.slot], self.pool.lasty[self.slot])
+        pos = lerp(last, self.rect.topleft, alpha)
+        screen_pos = [pos[i] - t_offset[i] - self.rotation_offset for i in [0, 1]]
+        return self.image, tuple(screen_pos)
+
+    # casts the bullet from where it was to where the pool moved it, hitting
+    # the first object in the way. returns if it hit anything. a bullet fired
+    # this tick starts inside the player, so it's only tested where it ends up
+    def loop(self, player, objects, fired=None) -> bool:
+        pool, slot = self.pool, self.slot
+        self.rect.topleft = (int(pool.x[slot]), int(pool.y[slot]))
+        start = (int(pool.lastx[slot]), int(pool.lasty[slot]))
+        if slot == fired:
+            start = self.rect.topleft
+        atlas = ASSETS.atlas(
+            join(PATH, "bullets", player.bullet + ".png"),
+            self.rect.w,
+            self.rect.h,
+            ROTATIONS,
+            LAZY,
+        )
+        self.image, self.mask, self.rotation_offset = atlas.get(pool.angle[slot])
+
+        size = self.mask.get_size()
+        area = pygame.Rect(start, size).union(pygame.Rect(self.rect.topleft, size))
+        near = [obj for obj in nearby(objects, area) if obj.name != "layer"]
+        if profiling:
+            profiler.count("checks", len(near))
+        vel = [self.rect[i] - start[i] for i in [0, 1]]
+        _, obj = cast(self.mask, start, vel, near)
+        if obj is None:
+            return False
+        if obj.name == "target":
+            obj.hit(player)
+        return True
+
+
+# a level object, stored in an ObjectStore
+class Object(StoredObject):
+    __slots__ = ()
+    dynamic = False  # image can change during the level
+
+    def __init__(self, store, space, name, path=None, angle=0) -> None:
+        path, angle = object_sprite(space, name, path, angle)  # space = x, y, w, h
+        super().__init__(store, store.add(space, name, angle))
+        self.show(object_look(store, path, space[2], space[3], angle))
+
+    def draw(self, alpha=1) -> pygame.Rect:
+        return wd.blit(*self.sprite(alpha))
+
+    # image and where on screen it goes
+    def sprite(self, alpha=1) -> tuple[pygame.Surface, tuple[float, float]]:
+        pos = [self.rect.x, self.rect.y]
+        return self.image, tuple(pos[i] - t_offset[i] for i in [0, 1])
+
+    # differs from a freshly built copy, so it can't be rebuilt when streaming
+    def changed(self) -> bool:
+        return False
+
+    # one tick of an activated object, returns if it needs more
+    def loop(self) -> bool:
+        return False
+
+
+# touching solid tiles joined by merge_tiles, colliding as one filled rect.
+# only its parts are drawn
+class Merged(Object):
+    __slots__ = ()
+
+    def __init__(self, store, space, name, parts) -> None:
+        StoredObject.__init__(self, store, store.add(space, name))
+        size = self.rect.size
+        filled = lambda: ([None], [pygame.mask.Mask(size, fill=True)])
+        self.show(store.look_of(("merged", *size), filled))
+        store.parts[self.slot] = [
+            (object_look(store, *tile_sprite(part)), pygame.Rect(part[0]))
+            for part in parts
+        ]
+
+    @property
+    def parts(self) -> list[tuple[pygame.Surface, pygame.Rect]]:
+        looks = self.store.looks
+        return [(looks[look][0][0], rect) for look, rect in self.store.parts[self.slot]]
+
+
+class Target(Object):
+    __slots__ = ()
+    dynamic = True
+
+    def __init__(self, store, space, hp=100, paths=["target", "target_shot"]):
+        super().__init__(store, space, paths[0])
+        store.hp[self.slot] = store.max_hp[self.slot] = hp
+        store.after[self.slot] = object_look(store, paths[1], space[2], space[3])
+
+    def changed(self) -> bool:
+        return self.store.hp[self.slot] != self.store.max_hp[self.slot]
+
+    def hit(self, player):
+        self.store.hp[self.slot] -= player.stats[5]
+        if self.store.hp[self.slot] <= 0:
+            self.show(self.store.after[self.slot])
+
+
+class Bouncepad(Object):
+    __slots__ = ()
+    dynamic = True
+
+    def __init__(self, store, space, angle=0, path="bouncepad") -> None:
+        super().__init__(store, space, "bouncepad", path, angle)
+        self.show(store.look[self.slot], self.frames - 1)
+
+    @property
+    def frames(self) -> int:
+        return len(self.store.looks[self.store.look[self.slot]][0])
+
+    @property
+    def bounced(self) -> int:
+        return self.store.bounced[self.slot]
+
+    @bounced.setter
+    def bounced(self, value) -> None:
+        self.store.bounced[self.slot] = value
+
+    def loop(self) -> bool:
+        store, slot, frames = self.store, self.slot, self.frames
+        delay = round(PAD_DELAY / STEP)
+        if 0 < store.bounced[slot] <= delay * frames:
+            store.bounced[slot] += 1
+            frame = (store.anim[slot] // delay) % frames
+            anim = store.anim[slot]
+            store.anim[slot] = 0 if anim // delay > frames else anim + 1
+        else:
+            store.anim[slot], store.bounced[slot] = 0, 0
+            frame = frames - 1
+        if store.frame[slot] != frame:
+            self.show(store.look[slot], frame)
+        return store.bounced[slot] > 0
+
+    def changed(self) -> bool:
+        return self.bounced > 0
+
+
+def obj_interaction(player, level_num, data, level, color) -> bool:
+    for obj in player.collide:
+        if not obj:
+            continue
+        if obj.name == "spike":
+            player.hit_count += 1
+        elif obj.name == "bouncepad":
+            angles, bounce = [3, 1, 2, 0], [BOUNCE_STRENGTH, -BOUNCE_STRENGTH] * 2
+            for i in range(4):
+                if obj.angle == angles[i] * 90 and player.collide[i] == obj:
+                    obj.bounced = 1
+                    level.activate(obj)
+                    if i // 2 == 0:
+                        player.xvel = bounce[i]
+                    else:
+                        player.yvel = bounce[i]
+        elif obj.name == "goal":
+            level_num += 1
+            data, level, color = next_level(level_num)
+            global gravity
+            gravity = data[-1]
+            player.respawn(data[0])
+            break
+    return level_num, data, level, color
+
+
+def keys(player, start) -> None:
+    keys = pressed
+    if keys[pygame.K_r]:
+        player.respawn(start)
+        scroll(player, look_offset)
+        return None
+    if not headless:
+        global profiling
+        profiling = profiler.toggle(keys[pygame.K_F3])
+    if keys[pygame.K_p] and not headless:
+        global redraw
+        pygame.display.toggle_fullscreen()
+        pygame.display.set_icon(pygame.image.load(join(PATH, ICON)))
+        pygame.display.update()
+        redraw = True
+    agile = AGILE * STEP
+    if (keys[pygame.K_LEFT] or keys[pygame.K_a]) and (not player.collide[0]):
+        player.walking = True
+        if player.direction != "left":
+            player.animcount = 0
+        player.xvel = -MSPEED if player.xvel <= agile - MSPEED else player.xvel - agile
+    elif (keys[pygame.K_RIGHT] or keys[pygame.K_d]) and (not player.collide[1]):
+        player.walking = True
+        if player.direction != "right":
+            player.animcount = 0
+        player.xvel = MSPEED if player.xvel >= MSPEED - agile else player.xvel + agile
+    if (
+        keys[pygame.K_UP] or keys[pygame.K_w] or keys[pygame.K_SPACE]
+    ) and player.fallcount == 0:
+        player.yvel = -JUMP * (gravity // abs(gravity))
+        player.animcount, player.fallcount = 0, 0
+
+
+# objects is the level, its unchanging objects are drawn from its static layer.
+# moving things are drawn alpha of the way from their last to current update
+def draw(wd, player, objects, color, alpha=1) -> None:
+    global redraw, t_offset
+    if profiling:
+        profiler.begin()
+    if redraw:
+        objects.layer.invalidate()
+        redraw = False
+    current, t_offset = t_offset, lerp(last_offset, t_offset, alpha)
+    dirty, drawn = objects.layer.begin(wd, t_offset), []
+    shown = [*objects.visible(t_offset, DIMS), *player.bullets]
+    drawn += wd.blits([obj.sprite(alpha) for obj in shown])
+    drawn.append(player.draw(alpha))
+    if profiling:
+        profiler.lap("draw")
+    if profiler.shown:
+        drawn.append(profiler.draw(wd))
+    dirty, t_offset = objects.layer.end(drawn, dirty), current
+    if dirty is None:
+        pygame.display.update()
+    else:
+        pygame.display.update(dirty)
+
+
+def scroll(player, look_offset) -> list[float, float]:  # offset amount up, left
+    if 0 <= mouse[0] <= WIDTH and 0 <= mouse[1] <= HEIGHT:
+        look_offset = [
+            floor((mouse[i] - DIMS[i] // 2) * player.stats[4]) for i in [0, 1]
+        ]
+    for i in [0, 1]:
+        border = [
+            player.float_rect[i] + 128 - DIMS[i] + SCROLL[i],
+            player.float_rect[i] - SCROLL[i],
+        ]
+        offset[i] = border[0] if offset[i] <= border[0] else offset[i]
+        offset[i] = border[1] if offset[i] >= border[1] else offset[i]
+    return offset, look_offset
+
+
+# one physics update
+def tick(player, level_num, data, level, color):
+    global offset, look_offset, t_offset, last_offset
+    player.last, last_offset = player.float_rect[:2], t_offset
+    player.bullets.keep_last()
+    if profiling:
+        profiler.begin()
+    offset, look_offset = scroll(player, look_offset)
+    t_offset = [offset[i] + look_offset[i] for i in [0, 1]]
+    if profiling:
+        profiler.lap("scroll")
+    if STREAM:
+        level.stream(active_area(player))
+        if profiling:
+            profiler.lap("stream")
+    player.loop(TICK_RATE, level, data)
+    if profiling:
+        profiler.lap("player.loop")
+    level.update()
+    if profiling:
+        profiler.lap("bouncepads")
+    level_num, data, level, color = obj_interaction(
+        player, level_num, data, level, color
+    )
+    if profiling:
+        profiler.lap("obj_interaction")
+    keys(player, data[0])
+    return level_num, data, level, color
+
+
+def main(wd, level_num) -> None:
+    global offset, look_offset, t_offset, mouse, gravity, pressed, clicking, profiling
+    print("\n --- RUNNING --- \n")
+    recorder, inputs = None, None
+    if REPLAY:
+        level_num, seed, inputs = load_trace(REPLAY)
+        inputs = iter(inputs)
+    elif RECORD:
+        recorder = Recorder(level_num)
+        seed = recorder.seed
+    if REPLAY or RECORD:
+        rng.seed(seed)
+    profiler.record = str(PROFILE).endswith(".csv")
+    profiling = profiler.active()
+    stats = Profile() if PROFILE and not profiler.record else None
+    if stats is not None:
+        stats.enable()
+    data, level, color = next_level(level_num)
+    startup.append(("first level", perf_counter()))
+    clock = pygame.time.Clock()
+    gravity = data[2]
+    offset, look_offset = [0, 0], [0, 0]
+    player = Player(data[0], STATS, GUN, AMMO, 128, 128)
+    startup.append(("player", perf_counter()))
+
+    run, step = True, 1 / TICK_RATE
+    lag = step  # update once before the first draw
+    while run:
+        frame = clock.tick(FPS) / 1000
+        lag += frame
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                run = False
+                break
+
+        if inputs is None:
+            mouse = pygame.mouse.get_pos()
+            pressed = pygame.key.get_pressed()
+            clicking = pygame.mouse.get_pressed(num_buttons=3)[0]
+        ticks = 0
+        while run and lag >= step and ticks < MAX_TICKS:
+            if inputs is not None:
+                played = next(inputs, None)
+                if played is None:
+                    run = False
+                    break
+                pressed, mouse, clicking = played
+            level_num, data, level, color = tick(player, level_num, data, level, color)
+            if recorder is not None:
+                recorder.add(pressed, mouse, clicking)
+            lag, ticks = lag - step, ticks + 1
+        lag = min(lag, step)  # too far behind, slow down instead of catching up
+        draw(wd, player, level, color, lag / step)
+        if startup[-1][0] == "player":
+            startup.append(("first frame", perf_counter()))
+            if STARTUP_TIMES:
+                print_startup()
+        if profiling:
+            counts = {"bullets": len(player.bullets), "objects": len(level)}
+            profiler.frame(frame, clock.get_fps(), **counts)
+
+    if recorder is not None:
+        recorder.save(RECORD)
+    if profiler.record:
+        profiler.save(PROFILE)
+    elif stats is not None:
+        stats.disable()
+        stats.dump_stats(PROFILE)
+    print("\n --- QUITTING --- \n")
+    pygame.quit()
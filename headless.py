@@ -0,0 +1,99 @@
+import argparse
+import json
+import pygame
+from time import perf_counter
+import game
+import replay
+from replay import Keys
+
+
+# pygame key code of a key name like "a", "space" or "LEFT"
+def key_code(name) -> int:
+    return getattr(pygame, "K_" + name)
+
+
+def state(tick, player, level_num, time) -> dict:
+    return {
+        "tick": tick,
+        "time": time,  # seconds the tick took
+        "level": level_num,
+        "x": player.float_rect[0],
+        "y": player.float_rect[1],
+        "xvel": player.xvel,
+        "yvel": player.yvel,
+        "hit": player.hit_count,
+        "bullets": len(player.bullets),
+        "collide": [obj.name if obj else None for obj in player.collide],
+        "deaths": dict(player.deaths),
+    }
+
+
+# plays level_num of LEVELS without drawing anything, one tick per input of
+# (keys held, mouse position on screen, left button down), as fast as it can.
+# returns the state of the player after each tick, stopping at the goal if
+# until_goal. a seed from a recorded trace makes it play out the same. with
+# draw, every tick is also drawn to game.wd (not timed)
+def simulate(level_num, inputs, until_goal=False, seed=None, draw=False) -> list[dict]:
+    if game.wd is None:
+        game.open_window(True)
+    if seed is not None:
+        game.rng.seed(seed)
+    data, level, color = game.next_level(level_num)
+    game.gravity = data[2]
+    game.offset, game.look_offset = [0, 0], [0, 0]
+    player = game.Player(data[0], game.STATS, game.GUN, game.AMMO, 128, 128)
+    states, start = [], level_num
+    for tick, (held, mouse, click) in enumerate(inputs):
+        game.pressed = held if isinstance(held, Keys) else Keys(held)
+        game.mouse, game.clicking = tuple(mouse), click
+        time = perf_counter()
+        level_num, data, level, color = game.tick(player, level_num, data, level, color)
+        states.append(state(tick, player, level_num, perf_counter() - time))
+        if draw:
+            game.draw(game.wd, player, level, color)
+        if until_goal and level_num != start:
+            break
+    return states
+
+
+# no keys held, mouse in the middle of the screen, for ticks ticks
+def idle(ticks) -> list[tuple]:
+    return [((), (game.WIDTH // 2, game.HEIGHT // 2), False)] * ticks
+
+
+# level number, inputs and seed from a trace recorded by the game (.trace) or
+# a json one: {"level": n, "seed": n or missing, "inputs": [[[key names],
+# [mouse x, y], left button down], ...]}
+def load_trace(path) -> tuple[int, list[tuple], int]:
+    if not path.endswith(".json"):
+        level_num, seed, inputs = replay.load(path)
+        return level_num, inputs, seed
+    with open(path) as file:
+        trace = json.load(file)
+    inputs = [
+        ([key_code(k) for k in held], mouse, click)
+        for held, mouse, click in trace["inputs"]
+    ]
+    return trace["level"], inputs, trace.get("seed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="run a level without a window")
+    parser.add_argument("level", type=int, nargs="?", help="level number from 1")
+    parser.add_argument("--ticks", type=int, default=600, help="ticks without input")
+    parser.add_argument("--trace", help="recorded or json trace to play back")
+    parser.add_argument("--out", help="json file to write every tick's state to")
+    args = parser.parse_args()
+
+    seed = None
+    if args.trace:
+        level_num, inputs, seed = load_trace(args.trace)
+    elif args.level:
+        level_num, inputs = args.level, idle(args.ticks)
+    else:
+        parser.error("give a level or a --trace")
+    states = simulate(level_num, inputs, seed=seed)
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(states, file)
+    print(json.dumps(states[-1]) if states else "no ticks run")
@@ -146,11 +146,11 @@ LEVELS = [
         [(448, 320, 128, 64), "block"],
         [(448, 384, 192, 256), "block"],
     ],
-    [[[60, 600], [-2000, 2000]], 20]
+    [[[60, 600], [-2000, 2000], 20]]
     + [[(128 * i + 64, 768, 128, 64), "block"] for i in range(100)],
     [[[60, -660], [-2000, 4000], 20], [(0, 0, 3200, 3200), "block"]]
     + [[(512 + i, 512, 64, 64), "target"] for i in range(20)],
-    [[[60, 600], [-2000, 2000]], 20]
+    [[[60, 600], [-2000, 2000], 20]]
     + [[(128 * i + 64, 768, 128, 64), "bouncepad", 0] for i in range(100)]
     + [
         [(i + 64, 640 - randint(0, 10) * 64, 64, 64), "bouncepad", 180]
@@ -0,0 +1,119 @@
+import mmap
+import struct
+
+# compiled levels file:
+#   header:  magic, version, level count, string count, string table offset
+#   levels:  start x, y, lowest y, highest y, gravity, first record, records
+#   records: x, y, w, h, name, arg count, arg types, 3rd arg, 4th arg
+#   strings: byte length, utf-8 bytes
+# args are stored by type: an int, a string id, or a string id of a list of
+# strings joined by "\n" (target paths)
+
+MAGIC, VERSION = b"PLVL", 2
+HEADER = struct.Struct("<4sHHII")
+LEVEL = struct.Struct("<5dII")
+RECORD = struct.Struct("<4dHBBii")
+LENGTH = struct.Struct("<H")
+NONE, INT, STR, STRS = 0, 1, 2, 3
+
+
+# numbers are stored as doubles, whole ones come back as ints
+def number(value) -> float:
+    return int(value) if value == int(value) else value
+
+
+def compile_levels(levels, path) -> None:
+    strings, ids = [], {}
+
+    def string_id(string) -> int:
+        if string not in ids:
+            ids[string] = len(strings)
+            strings.append(string)
+        return ids[string]
+
+    def encode(arg) -> tuple[int, int]:
+        if type(arg) is int:
+            return INT, arg
+        if type(arg) is str:
+            return STR, string_id(arg)
+        return STRS, string_id("\n".join(arg))
+
+    table, records = [], []
+    for level in levels:
+        start, bounds, gravity = level[0]
+        table.append(LEVEL.pack(*start, *bounds, gravity, len(records), len(level) - 1))
+        for obj in level[1:]:
+            kinds, args = [NONE, NONE], [0, 0]
+            for i, arg in enumerate(obj[2:4]):
+                kinds[i], args[i] = encode(arg)
+            records.append(
+                RECORD.pack(
+                    *obj[0],
+                    string_id(obj[1]),
+                    len(obj),
+                    kinds[0] | kinds[1] << 2,
+                    *args,
+                )
+            )
+    offset = HEADER.size + LEVEL.size * len(table) + RECORD.size * len(records)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(table), len(strings), offset))
+        file.write(b"".join(table + records))
+        for string in strings:
+            data = string.encode()
+            file.write(LENGTH.pack(len(data)) + data)
+
+
+# compiled levels, read from a memory map one level at a time. indexing it
+# gives a level in the same shape as an entry of level.LEVELS
+class LevelFile:
+    def __init__(self, path) -> None:
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, count, offset = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} levels file")
+        self.records = HEADER.size + LEVEL.size * self.count
+        self.strings = []
+        for _ in range(count):
+            length = LENGTH.unpack_from(self.map, offset)[0]
+            offset += LENGTH.size
+            self.strings.append(str(self.map[offset : offset + length], "utf-8"))
+            offset += length
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, n) -> list:
+        if n < 0:
+            n += self.count
+        if not 0 <= n < self.count:
+            raise IndexError("level index out of range")
+        *header, first, count = LEVEL.unpack_from(
+            self.map, HEADER.size + LEVEL.size * n
+        )
+        header = [number(i) for i in header]
+        level = [[header[0:2], header[2:4], header[4]]]
+        start = self.records + RECORD.size * first
+        view = memoryview(self.map)[start : start + RECORD.size * count]
+        for record in RECORD.iter_unpack(view):
+            name, args, kinds, *values = record[4:]
+            obj = [tuple(number(i) for i in record[:4]), self.strings[name]]
+            for i in range(args - 2):
+                kind, value = kinds >> 2 * i & 3, values[i]
+                if kind == INT:
+                    obj.append(value)
+                elif kind == STR:
+                    obj.append(self.strings[value])
+                else:
+                    obj.append(self.strings[value].split("\n"))
+            level.append(obj)
+        view.release()
+        return level
+
+
+if __name__ == "__main__":
+    from level import LEVELS
+
+    compile_levels(LEVELS, "levels.bin")
+    print(f"compiled {len(LEVELS)} levels to levels.bin")
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from cache import decode
+
+
+# decodes sprites on a pool of worker threads, one task per png, so a level's
+# pngs are read and decoded at the same time. see decode for what sprites are
+class Loader:
+    def __init__(self, workers=4) -> None:
+        self.workers, self.pool = workers, None  # pool is started when first used
+
+    def start(self, sprites):
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        pngs = {}
+        for sprite in sprites:
+            pngs.setdefault(sprite[0], []).append(sprite)
+        return Job([self.pool.submit(decode, group) for group in pngs.values()])
+
+
+# sprites being decoded by a Loader. the result goes to AssetCache.adopt
+class Job:
+    def __init__(self, futures) -> None:
+        self.futures = futures
+
+    # fraction of pngs decoded
+    def progress(self) -> float:
+        if not self.futures:
+            return 1.0
+        return sum(future.done() for future in self.futures) / len(self.futures)
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
+
+    # everything decoded, waits for it if it isn't done
+    def result(self) -> dict:
+        decoded = {}
+        for future in self.futures:
+            decoded.update(future.result())
+        return decoded
+
+    # calls show(progress) every interval seconds until done, then result()
+    def wait(self, show, interval=1 / 60) -> dict:
+        pending = self.futures
+        while pending:
+            show(self.progress())
+            pending = wait(pending, timeout=interval).not_done
+        show(1.0)
+        return self.result()
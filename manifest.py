@@ -0,0 +1,38 @@
+import json
+import os
+from os.path import isfile, join, relpath
+
+# assets manifest: json of each folder under the assets folder, relative to
+# it with "/" separators, to the names of the files directly inside it
+
+
+def build_manifest(root) -> dict[str, list[str]]:
+    listing = {}
+    for folder, _, files in os.walk(root):
+        name = relpath(folder, root).replace(os.sep, "/")
+        listing[name] = sorted(f for f in files if f != "manifest.json")
+    return listing
+
+
+# file names in asset folders, read from the manifest if there is one,
+# otherwise by listing the folder
+class Manifest:
+    def __init__(self, root, path=None) -> None:
+        self.root, self.listing = root, None
+        if path and isfile(path):
+            with open(path) as file:
+                self.listing = json.load(file)
+
+    def files(self, folder) -> list[str]:
+        name = relpath(folder, self.root).replace(os.sep, "/")
+        if self.listing is not None and name in self.listing:
+            return self.listing[name]
+        return sorted(f for f in os.listdir(folder) if isfile(join(folder, f)))
+
+
+if __name__ == "__main__":
+    path = join("assets", "manifest.json")
+    listing = build_manifest("assets")
+    with open(path, "w") as file:
+        json.dump(listing, file, indent=1)
+    print(f"listed {sum(map(len, listing.values()))} assets in {path}")
@@ -0,0 +1,87 @@
+import csv
+from collections import deque
+from time import perf_counter
+import pygame
+
+SECTIONS = ["scroll", "stream", "player.loop", "bouncepads", "obj_interaction", "draw"]
+COUNTS = ["bullets", "objects", "checks"]
+GRAPH = [240, 60]  # frame time graph size, 1 pixel per frame wide
+GRAPH_MS = 50  # frame time at the top of the graph
+TEXT, BACK, BAR, SLOW = (255, 255, 255), (0, 0, 0, 160), (96, 255, 96), (255, 96, 96)
+
+
+# times the stages of each frame and shows them over the game. laps are only
+# taken while active, which callers check first so it costs nothing when off
+class Profiler:
+    def __init__(self, fps=60, record=False) -> None:
+        self.fps, self.record = fps, record  # record keeps every frame for save
+        self.shown, self.held = False, False
+        self.start, self.sections, self.counts = 0, {}, {}
+        self.last = ({}, {}, 0, 0)  # sections, counts, frame time, fps shown
+        self.history, self.rows = deque(maxlen=GRAPH[0]), []
+        self.font = None
+
+    def active(self) -> bool:
+        return self.shown or self.record
+
+    # shows or hides the overlay when key is first pressed, returns active()
+    def toggle(self, held) -> bool:
+        if held and not self.held:
+            self.shown = not self.shown
+        self.held = held
+        return self.active()
+
+    def begin(self) -> None:
+        self.start = perf_counter()
+
+    # adds the time since begin or the last lap to section name
+    def lap(self, name) -> None:
+        now = perf_counter()
+        self.sections[name] = self.sections.get(name, 0) + now - self.start
+        self.start = now
+
+    def count(self, name, n=1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def frame(self, time, fps, **counts) -> None:
+        counts = self.counts | counts
+        self.history.append(time)
+        if self.record:
+            row = [len(self.rows), time * 1000, fps]
+            row += [counts.get(name, 0) for name in COUNTS]
+            row += [self.sections.get(name, 0) * 1000 for name in SECTIONS]
+            self.rows.append(row)
+        self.last = (self.sections, counts, time, fps)
+        self.sections, self.counts = {}, {}
+
+    # draws the last frame's numbers and the frame time graph in the top left,
+    # returns the area covered
+    def draw(self, wd) -> pygame.Rect:
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        sections, counts, time, fps = self.last
+        lines = [f"{fps:5.1f} fps  {time * 1000:5.1f} ms"]
+        lines += [f"{name} {counts.get(name, 0)}" for name in COUNTS]
+        lines += [f"{name} {sections[name] * 1000:.2f} ms" for name in sections]
+        height = self.font.get_linesize()
+        panel = pygame.Surface(
+            (GRAPH[0], GRAPH[1] + height * len(lines) + 4), pygame.SRCALPHA
+        )
+        panel.fill(BACK)
+        for x, frame in enumerate(self.history):
+            bar = min(frame * 1000 / GRAPH_MS, 1) * GRAPH[1]
+            color = SLOW if frame > 1.5 / self.fps else BAR
+            panel.fill(color, (x, GRAPH[1] - bar, 1, bar))
+        target = GRAPH[1] - 1000 / self.fps / GRAPH_MS * GRAPH[1]
+        panel.fill(TEXT, (0, target, GRAPH[0], 1))
+        for i, line in enumerate(lines):
+            text = self.font.render(line, True, TEXT)
+            panel.blit(text, (4, GRAPH[1] + 2 + i * height))
+        return wd.blit(panel, (0, 0))
+
+    # every recorded frame as csv, times in milliseconds
+    def save(self, path) -> None:
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "time", "fps"] + COUNTS + SECTIONS)
+            writer.writerows(self.rows)
@@ -0,0 +1,74 @@
+import pygame
+from math import floor
+
+
+# objects that never change their image, drawn once into chunk x chunk
+# surfaces so a frame only blits the few chunks on screen
+class StaticLayer:
+    def __init__(self, objects, color, chunk=512) -> None:
+        self.color, self.chunk, self.chunks = color, chunk, {}
+        self.origin, self.dirty = None, []  # view drawn last frame
+        for obj in objects:
+            self.add(obj)
+
+    def chunks_of(self, rect) -> list[tuple[int, int]]:
+        c = self.chunk
+        x0, y0 = rect.left // c, rect.top // c
+        x1, y1 = (rect.right - 1) // c, (rect.bottom - 1) // c
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    # draws obj, or each of its parts if it has them, into the given chunks,
+    # or every chunk it overlaps
+    def add(self, obj, keys=None) -> None:
+        parts = getattr(obj, "parts", None) or [(obj.image, obj.rect)]
+        for x, y in self.chunks_of(obj.rect) if keys is None else keys:
+            for image, rect in parts:
+                pos = (rect.x - x * self.chunk, rect.y - y * self.chunk)
+                self.surface(x, y).blit(image, pos)
+        self.origin = None
+
+    def drop(self, key) -> None:
+        self.chunks.pop(key, None)
+        self.origin = None
+
+    def surface(self, x, y) -> pygame.Surface:
+        if (x, y) not in self.chunks:
+            surface = pygame.Surface((self.chunk, self.chunk)).convert()
+            surface.fill(self.color)
+            self.chunks[(x, y)] = surface
+        return self.chunks[(x, y)]
+
+    # draws the part of the level at origin that's inside area of the screen
+    def draw(self, wd, origin, area=None) -> None:
+        area = wd.get_rect() if area is None else area.clip(wd.get_rect())
+        wd.fill(self.color, area)
+        c = self.chunk
+        x0, y0 = floor((origin[0] + area.left) / c), floor((origin[1] + area.top) / c)
+        x1 = floor((origin[0] + area.right - 1) / c)
+        y1 = floor((origin[1] + area.bottom - 1) / c)
+        wd.set_clip(area)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                if (x, y) in self.chunks:
+                    pos = (floor(x * c - origin[0]), floor(y * c - origin[1]))
+                    wd.blit(self.chunks[(x, y)], pos)
+        wd.set_clip(None)
+
+    # redraws the level behind the sprites drawn last frame, or all of it if
+    # the view moved, then returns the areas of the screen that need updating
+    def begin(self, wd, origin) -> list[pygame.Rect]:
+        if origin != self.origin:
+            self.origin, self.dirty = list(origin), []
+            self.draw(wd, origin)
+            return None
+        for rect in self.dirty:
+            self.draw(wd, origin, rect)
+        return self.dirty
+
+    # rects of sprites drawn this frame, returns what to pass display.update
+    def end(self, drawn, dirty) -> list[pygame.Rect]:
+        self.dirty = drawn
+        return None if dirty is None else dirty + drawn
+
+    def invalidate(self) -> None:
+        self.origin = None
@@ -0,0 +1,146 @@
+import struct
+from random import randrange
+import pygame
+
+# input traces:
+#   header: magic, version, level, random seed, tick count
+#   ticks:  one flags byte per tick. IDLE set means the input didn't change
+#           for (flags & 0x7f) + 1 ticks, otherwise it's followed by the new
+#           key bits (2 bytes) if KEYS_CHANGED, then the change in mouse x
+#           and y as zigzag varints if X_CHANGED, Y_CHANGED
+
+MAGIC, VERSION = b"PTRC", 1
+HEADER = struct.Struct("<4sBHII")
+KEY_BITS = struct.Struct("<H")
+KEYS = [
+    pygame.K_a,
+    pygame.K_d,
+    pygame.K_w,
+    pygame.K_LEFT,
+    pygame.K_RIGHT,
+    pygame.K_UP,
+    pygame.K_SPACE,
+    pygame.K_r,
+]
+CLICK = 1 << len(KEYS)  # left mouse button, stored with the keys
+KEYS_CHANGED, X_CHANGED, Y_CHANGED, IDLE = 1, 2, 4, 0x80
+
+
+# stands in for pygame.key.get_pressed with only the keys in held down
+class Keys:
+    def __init__(self, held=()) -> None:
+        self.held = set(held)
+
+    def __getitem__(self, key) -> bool:
+        return key in self.held
+
+
+def key_bits(pressed, click) -> int:
+    bits = sum(1 << i for i, key in enumerate(KEYS) if pressed[key])
+    return bits | CLICK if click else bits
+
+
+def from_bits(bits) -> tuple[Keys, bool]:
+    return Keys(key for i, key in enumerate(KEYS) if bits >> i & 1), bool(bits & CLICK)
+
+
+def varint(value) -> bytes:
+    value = value * 2 if value >= 0 else -value * 2 - 1  # zigzag
+    data = bytearray()
+    while value > 0x7F:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def read_varint(data, pos) -> tuple[int, int]:
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        value |= (byte & 0x7F) << shift
+        pos, shift = pos + 1, shift + 7
+        if byte < 0x80:
+            break
+    return (value // 2 if value % 2 == 0 else -(value + 1) // 2), pos
+
+
+# ticks is a list of (key bits, mouse x, mouse y)
+def encode(ticks) -> bytes:
+    data, last, idle = bytearray(), (0, 0, 0), 0
+    for bits, x, y in ticks:
+        if (bits, x, y) == last:
+            idle += 1
+            if idle == 0x80:
+                data.append(IDLE | 0x7F)
+                idle = 0
+            continue
+        if idle:
+            data.append(IDLE | idle - 1)
+            idle = 0
+        flags = (bits != last[0]) * KEYS_CHANGED
+        flags |= (x != last[1]) * X_CHANGED | (y != last[2]) * Y_CHANGED
+        data.append(flags)
+        if flags & KEYS_CHANGED:
+            data += KEY_BITS.pack(bits)
+        if flags & X_CHANGED:
+            data += varint(x - last[1])
+        if flags & Y_CHANGED:
+            data += varint(y - last[2])
+        last = (bits, x, y)
+    if idle:
+        data.append(IDLE | idle - 1)
+    return bytes(data)
+
+
+def decode(data) -> list[tuple[int, int, int]]:
+    ticks, pos, bits, x, y = [], 0, 0, 0, 0
+    while pos < len(data):
+        flags, pos = data[pos], pos + 1
+        if flags & IDLE:
+            ticks += [(bits, x, y)] * ((flags & 0x7F) + 1)
+            continue
+        if flags & KEYS_CHANGED:
+            bits = KEY_BITS.unpack_from(data, pos)[0]
+            pos += KEY_BITS.size
+        if flags & X_CHANGED:
+            change, pos = read_varint(data, pos)
+            x += change
+        if flags & Y_CHANGED:
+            change, pos = read_varint(data, pos)
+            y += change
+        ticks.append((bits, x, y))
+    return ticks
+
+
+# collects the input of every tick, seed is what the game's random numbers
+# have to be seeded with for a replay to match
+class Recorder:
+    def __init__(self, level_num, seed=None) -> None:
+        self.level, self.ticks = level_num, []
+        self.seed = randrange(2**32) if seed is None else seed
+
+    def add(self, pressed, mouse, click) -> None:
+        self.ticks.append((key_bits(pressed, click), mouse[0], mouse[1]))
+
+    def save(self, path) -> None:
+        header = HEADER.pack(MAGIC, VERSION, self.level, self.seed, len(self.ticks))
+        with open(path, "wb") as file:
+            file.write(header + encode(self.ticks))
+
+
+# level, seed and per tick (keys, mouse position, left button down) of a trace
+def load(path) -> tuple[int, int, list[tuple]]:
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, level_num, seed, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} input trace")
+    ticks = decode(data[HEADER.size :])
+    if len(ticks) != count:
+        raise ValueError(f"{path} has {len(ticks)} ticks, expected {count}")
+    inputs = []
+    for bits, x, y in ticks:
+        keys, click = from_bits(bits)
+        inputs.append((keys, (x, y), click))
+    return level_num, seed, inputs
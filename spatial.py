@@ -0,0 +1,301 @@
+import pygame
+from collections import OrderedDict
+from math import ceil, floor
+
+try:
+    import numpy
+except ImportError:  # objects are culled one at a time instead
+    numpy = None
+
+
+# area an object can collide in, its mask can be bigger than its rect
+def bounds(obj) -> pygame.Rect:
+    mask = getattr(obj, "mask", None)
+    if mask is None:
+        return pygame.Rect(obj.rect)
+    return pygame.Rect(obj.rect.topleft, mask.get_size())
+
+
+# uniform grid of cell x cell squares, each listing the objects overlapping it
+class SpatialGrid:
+    def __init__(self, cell=64) -> None:
+        self.cell, self.cells = cell, {}
+        self.keys, self.order = {}, {}  # id(obj): cells, order in queries
+        self.count = 0
+
+    def cells_of(self, rect) -> tuple[tuple[int, int]]:
+        c = self.cell
+        x0, y0 = rect.left // c, rect.top // c
+        x1, y1 = (rect.right - 1) // c, (rect.bottom - 1) // c
+        return tuple((x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+
+    # objects come back from queries sorted by order, insertion order if None
+    def insert(self, obj, order=None) -> None:
+        if id(obj) in self.keys:
+            return self.update(obj)
+        self.order[id(obj)] = self.count if order is None else order
+        self.count += 1
+        self.keys[id(obj)] = self.cells_of(bounds(obj))
+        for key in self.keys[id(obj)]:
+            self.cells.setdefault(key, []).append(obj)
+        obj.grid = self
+
+    def remove(self, obj) -> None:
+        for key in self.keys.pop(id(obj), ()):
+            self.cells[key].remove(obj)
+            if not self.cells[key]:
+                del self.cells[key]
+        self.order.pop(id(obj), None)
+        obj.grid = None
+
+    # call when obj moved or its image changed size
+    def update(self, obj) -> None:
+        keys = self.cells_of(bounds(obj))
+        if keys == self.keys.get(id(obj)):
+            return None
+        for key in self.keys[id(obj)]:
+            self.cells[key].remove(obj)
+            if not self.cells[key]:
+                del self.cells[key]
+        self.keys[id(obj)] = keys
+        for key in keys:
+            self.cells.setdefault(key, []).append(obj)
+
+    # objects that may overlap rect, in the order they were inserted
+    def query(self, rect) -> list:
+        found = {}
+        for key in self.cells_of(rect):
+            for obj in self.cells.get(key, ()):
+                found[id(obj)] = obj
+        return sorted(found.values(), key=lambda obj: self.order[id(obj)])
+
+
+# list of a level's objects with a grid for looking up the ones near a rect.
+# only objects that were activated get updated, until they go idle again
+class Level(list):
+    def __init__(self, objects, cell=64) -> None:
+        super().__init__(objects)
+        self.grid = SpatialGrid(cell)
+        self.dynamic = [obj for obj in self if obj.dynamic]
+        self.boxes = None  # rects of dynamic as an array, made by visible
+        self.active = {}  # objects to update each tick, in the order activated
+        self.layer = None  # pre-drawn static objects
+        for obj in self:
+            self.grid.insert(obj)
+
+    def near(self, rect) -> list:
+        return self.grid.query(rect)
+
+    # dynamic objects overlapping the size area at origin, which can be floats
+    def visible(self, origin, size) -> list:
+        if numpy is None:
+            return [
+                obj
+                for obj in self.dynamic
+                if all(
+                    0 < obj.rect[i] - origin[i] + obj.rect[i + 2]
+                    and obj.rect[i] - origin[i] < size[i]
+                    for i in [0, 1]
+                )
+            ]
+        if self.boxes is None:
+            self.boxes = numpy.array([obj.rect for obj in self.dynamic], float)
+            self.boxes.shape = (len(self.dynamic), 4)
+        pos = self.boxes[:, :2] - origin
+        shown = ((pos + self.boxes[:, 2:] > 0) & (pos < size)).all(axis=1)
+        return [self.dynamic[n] for n in numpy.flatnonzero(shown).tolist()]
+
+    def activate(self, obj) -> None:
+        self.active[obj] = None
+
+    # runs a tick of each active object, dropping the ones that went idle
+    def update(self) -> None:
+        for obj in list(self.active):
+            if not obj.loop():
+                del self.active[obj]
+
+
+# level that only builds the objects of the chunk x chunk squares near the
+# areas passed to stream, keeping at most cap squares built. objects keep
+# their place in the level when built, so collisions resolve like in a Level
+class StreamedLevel(Level):
+    def __init__(self, entries, build, cell=64, chunk=512, cap=64) -> None:
+        super().__init__([], cell)
+        self.entries, self.build, self.chunk, self.cap = entries, build, chunk, cap
+        self.index = {}  # chunk: indexes of entries overlapping it
+        for n, entry in enumerate(entries):
+            for key in self.chunks_of(pygame.Rect(entry[0])):
+                self.index.setdefault(key, []).append(n)
+        self.loaded = OrderedDict()  # chunks built, least recently used first
+        self.built, self.users = {}, {}  # entry index: object, chunks using it
+        self.kept = {}  # changed objects of unloaded chunks
+
+    def chunks_of(self, rect) -> list[tuple[int, int]]:
+        c = self.chunk
+        x0, y0 = rect.left // c, rect.top // c
+        x1, y1 = (rect.right - 1) // c, (rect.bottom - 1) // c
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    # builds the chunks overlapping areas, then unloads the least recently
+    # used ones not in areas until there are at most cap left
+    def stream(self, areas) -> None:
+        needed = sorted(
+            {k for a in areas for k in self.chunks_of(a) if k in self.index}
+        )
+        for key in needed:
+            if key in self.loaded:
+                self.loaded.move_to_end(key)
+            else:
+                self.load(key)
+        keep = set(needed)
+        for key in list(self.loaded):
+            if len(self.loaded) <= self.cap:
+                break
+            if key not in keep:
+                self.unload(key)
+
+    def load(self, key) -> None:
+        self.loaded[key] = None
+        for n in self.index[key]:
+            if n not in self.built:
+                obj = self.kept.pop(n, None) or self.build(self.entries[n])
+                self.built[n], self.users[n] = obj, set()
+                self.grid.insert(obj, n)
+                self.append(obj)
+                if obj.dynamic:
+                    self.dynamic.append(obj)
+                    self.boxes = None
+                    if obj.changed():
+                        self.activate(obj)
+            self.users[n].add(key)
+            if self.layer and not self.built[n].dynamic:
+                self.layer.add(self.built[n], [key])
+
+    def unload(self, key) -> None:
+        del self.loaded[key]
+        if self.layer:
+            self.layer.drop(key)
+        for n in self.index[key]:
+            self.users[n].discard(key)
+            if self.users[n]:
+                continue
+            obj = self.built.pop(n)
+            del self.users[n]
+            self.grid.remove(obj)
+            self.remove(obj)
+            if obj.dynamic:
+                self.dynamic.remove(obj)
+                self.boxes = None
+                self.active.pop(obj, None)
+            if obj.changed():
+                self.kept[n] = obj
+            else:
+                obj.free()
+
+
+# objects possibly overlapping rect, or all of them if they aren't indexed
+def nearby(objects, rect) -> list:
+    return objects.near(rect) if isinstance(objects, Level) else objects
+
+
+# smallest rect around the set bits of mask
+def mask_box(mask) -> pygame.Rect:
+    rects = mask.get_bounding_rects()
+    return rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0)
+
+
+# rect covering obj's mask when the mask is a filled rectangle, else None
+def solid_rect(obj):
+    cached = getattr(obj, "solid", None)
+    if cached and cached[0] is obj.mask:
+        return cached[1]
+    box = mask_box(obj.mask)
+    solid = None
+    if box.w and box.h and obj.mask.count() == box.w * box.h:
+        solid = box.move(obj.rect.topleft)
+    obj.solid = (obj.mask, solid)
+    return solid
+
+
+# rect around the set bits of obj's mask, kept until its mask changes
+def shape_rect(obj) -> pygame.Rect:
+    cached = getattr(obj, "shape", None)
+    if not (cached and cached[0] is obj.mask):
+        cached = obj.shape = (obj.mask, mask_box(obj.mask))
+    return cached[1].move(obj.rect.topleft)
+
+
+# earliest fraction of vel that box (x, y, w, h) can move before touching
+# one of rects, as (fraction, index of rect hit, axis it was hit on)
+def sweep(box, vel, rects) -> tuple[float, int, int]:
+    best = (1.0, None, None)
+    for n, rect in enumerate(rects):
+        entry, leave, axis = float("-inf"), float("inf"), None
+        for i in [0, 1]:
+            low, high = box[i], box[i] + box[i + 2]
+            near, far = rect[i], rect[i] + rect[i + 2]
+            if vel[i] == 0:
+                if high <= near or low >= far:
+                    entry = float("inf")
+                    break
+                continue
+            if vel[i] > 0:
+                start, end = (near - high) / vel[i], (far - low) / vel[i]
+            else:
+                start, end = (far - low) / vel[i], (near - high) / vel[i]
+            if start > entry:
+                entry, axis = start, i
+            leave = min(leave, end)
+        if axis is not None and 0 <= entry < leave and entry < best[0]:
+            best = (entry, n, axis)
+    return best
+
+
+# fractions of vel between which box (x, y, w, h) moving by vel overlaps rect,
+# clipped to the move, or None if it never does
+def overlap_span(box, vel, rect) -> tuple[float, float]:
+    entry, leave = 0.0, 1.0
+    for i in [0, 1]:
+        low, high = box[i], box[i] + box[i + 2]
+        near, far = rect[i], rect[i] + rect[i + 2]
+        if vel[i] == 0:
+            if high <= near or low >= far:
+                return None
+            continue
+        start, end = sorted([(near - high) / vel[i], (far - low) / vel[i]])
+        entry, leave = max(entry, start), min(leave, end)
+    return (entry, leave) if entry < leave else None
+
+
+# first of objects that mask hits moving from pos by vel, as (fraction of vel
+# moved, object), or (None, None). mask is tested a pixel of the way at a
+# time, only while its bounds overlap an object's, nearest objects first
+def cast(mask, pos, vel, objects) -> tuple:
+    box = mask_box(mask).move(pos)
+    spans = []
+    for obj in objects:
+        rect = solid_rect(obj) or shape_rect(obj)
+        span = overlap_span(box, vel, rect)
+        if span:
+            spans.append((span, obj))
+    spans.sort(key=lambda span: span[0][0])
+    steps = max(ceil(max(abs(vel[0]), abs(vel[1]))), 1)
+    best, swept = (None, None), box.union(box.move(vel))
+    area = None  # filled mask of swept, to skip objects with nothing in it
+    for (entry, leave), obj in spans:
+        if best[0] is not None and entry >= best[0]:
+            break
+        if not solid_rect(obj):
+            area = area or pygame.mask.Mask(swept.size, fill=True)
+            offset = (swept.x - obj.rect.x, swept.y - obj.rect.y)
+            if not obj.mask.overlap(area, offset):
+                continue
+        for step in range(floor(entry * steps), ceil(leave * steps) + 1):
+            t = step / steps
+            at = [round(pos[i] + vel[i] * t) - obj.rect[i] for i in [0, 1]]
+            if best[0] is not None and t >= best[0]:
+                break
+            if obj.mask.overlap(mask, at):
+                best = (t, obj)
+                break
+    return best
@@ -0,0 +1,108 @@
+from array import array
+import pygame
+
+# typecode of each field kept per object
+FIELDS = {
+    "x": "i",
+    "y": "i",
+    "w": "i",
+    "h": "i",
+    "kind": "H",  # index in names
+    "look": "H",  # index in looks of the frames shown
+    "frame": "H",  # which of them
+    "angle": "h",
+    "hp": "d",  # targets
+    "max_hp": "d",
+    "after": "H",  # look of a target once it's destroyed
+    "bounced": "H",  # bouncepads
+    "anim": "H",
+}
+
+
+# a level's objects as one array per field, with the frames and masks they
+# show loaded once per (path, width, height, angle) and shared. slots of
+# removed objects are reused. the game sees them through StoredObject views
+class ObjectStore:
+    def __init__(self) -> None:
+        self.names, self.kinds = [], {}  # name: index in names
+        self.looks, self.keys = [], {}  # (frames, masks), key: index in looks
+        self.free, self.size = [], 0
+        self.parts = {}  # slot of a merged tile: [(look, rect)] of its parts
+        for name, code in FIELDS.items():
+            setattr(self, name, array(code))
+
+    def __len__(self) -> int:
+        return self.size - len(self.free)
+
+    def kind_of(self, name) -> int:
+        if name not in self.kinds:
+            self.kinds[name] = len(self.names)
+            self.names.append(name)
+        return self.kinds[name]
+
+    # index of the look for key, calling load for its (frames, masks) if new
+    def look_of(self, key, load) -> int:
+        if key not in self.keys:
+            self.keys[key] = len(self.looks)
+            self.looks.append(load())
+        return self.keys[key]
+
+    def add(self, space, name, angle=0) -> int:
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot, self.size = self.size, self.size + 1
+            for field in FIELDS:
+                getattr(self, field).append(0)
+        for field in FIELDS:
+            getattr(self, field)[slot] = 0
+        rect = pygame.Rect(space)  # rounds like the sprites' rects did
+        self.x[slot], self.y[slot], self.w[slot], self.h[slot] = rect
+        self.kind[slot], self.angle[slot] = self.kind_of(name), angle
+        return slot
+
+    def remove(self, slot) -> None:
+        self.parts.pop(slot, None)
+        self.free.append(slot)
+
+    def rect(self, slot) -> pygame.Rect:
+        return pygame.Rect(self.x[slot], self.y[slot], self.w[slot], self.h[slot])
+
+
+# one object of an ObjectStore, with the rect, name, image and mask of the
+# sprite it stands in for. grid, solid and shape are set by spatial
+class StoredObject:
+    __slots__ = ("store", "slot", "rect", "grid", "solid", "shape")
+
+    def __init__(self, store, slot) -> None:
+        self.store, self.slot = store, slot
+        self.rect = store.rect(slot)  # objects don't move, collisions use it a lot
+        self.grid = self.solid = self.shape = None
+
+    @property
+    def name(self) -> str:
+        return self.store.names[self.store.kind[self.slot]]
+
+    @property
+    def angle(self) -> int:
+        return self.store.angle[self.slot]
+
+    @property
+    def image(self) -> pygame.Surface:
+        store = self.store
+        return store.looks[store.look[self.slot]][0][store.frame[self.slot]]
+
+    @property
+    def mask(self) -> pygame.mask.Mask:
+        store = self.store
+        return store.looks[store.look[self.slot]][1][store.frame[self.slot]]
+
+    # switches to frame of look, moving it in the grid if its size changed
+    def show(self, look, frame=0) -> None:
+        self.store.look[self.slot], self.store.frame[self.slot] = look, frame
+        if self.grid:
+            self.grid.update(self)
+
+    # gives its slot back to the store, the view can't be used after
+    def free(self) -> None:
+        self.store.remove(self.slot)
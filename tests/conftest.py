@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the game's modules are at the top of the repo, not in a package, and it
+# opens its assets relative to there
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
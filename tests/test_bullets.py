@@ -0,0 +1,60 @@
+from random import Random
+import pygame
+import pytest
+import bullets
+from bullets import BulletPool, rounded
+
+
+# (slot, x, y, angle) of every live bullet after running a pool for ticks,
+# spawning a few bullets from origin every tick
+def run(ticks=120, scale=1, seed=0) -> list[list[tuple]]:
+    rng, pool, states = Random(seed), BulletPool(lambda pool, slot: slot, 4), []
+    for _ in range(ticks):
+        for _ in range(rng.randint(0, 3)):
+            xvel, yvel = rng.uniform(-30, 30), rng.uniform(-20, 5)
+            pool.spawn(0, 0, xvel, yvel, rng.uniform(-10, 10), rng.uniform(0, 2))
+        pool.keep_last()
+        kept = pool.step(1, 60, scale, (0, 0), (500, 400))
+        pool.kill([slot for slot in kept if pool.x[slot] < -500])
+        states.append(
+            [
+                (slot, int(pool.x[slot]), int(pool.y[slot]), float(pool.angle[slot]))
+                for slot in pool.live
+            ]
+        )
+    return states
+
+
+@pytest.mark.parametrize("scale", [1, 0.5])
+def test_numpy_and_lists_agree(monkeypatch, scale) -> None:
+    if bullets.numpy is None:
+        pytest.skip("numpy isn't installed")
+    vectorized = run(scale=scale)
+    monkeypatch.setattr(bullets, "numpy", None)
+    assert run(scale=scale) == vectorized
+
+
+def test_rounded_like_rects() -> None:
+    rect = pygame.Rect(0, 0, 1, 1)
+    for value in [0.5, 1.5, -0.5, -1.5, 2.4, -2.6]:
+        rect.x = value
+        assert rounded(value) == rect.x
+
+
+def test_slots_are_reused() -> None:
+    pool = BulletPool(lambda pool, slot: slot, 2)
+    slots = [pool.spawn(0, 0, 1, 0, 0, 1) for _ in range(5)]
+    assert pool.capacity == 8 and len(set(slots)) == 5
+    pool.kill(slots[1:3])
+    assert list(pool) == [slots[0]] + slots[3:]
+    assert pool.spawn(0, 0, 1, 0, 0, 1) in slots[1:3]
+    pool.clear()
+    assert len(pool) == 0 and len(pool.free) == pool.capacity
+
+
+def test_step_moves_and_frees() -> None:
+    pool = BulletPool(lambda pool, slot: slot)
+    near, far = pool.spawn(0, 0, 10, 0, 90, 0), pool.spawn(0, 0, 600, 0, 0, 0)
+    assert pool.step(1, 60, 1, (0, 0), (500, 500)) == [near]
+    assert (pool.x[near], pool.y[near], pool.angle[near]) == (10, 0, 90)
+    assert far in pool.free
@@ -0,0 +1,37 @@
+import pytest
+from level import LEVELS
+from levelfile import LevelFile, compile_levels
+
+
+@pytest.fixture(scope="module")
+def levels(tmp_path_factory):
+    path = tmp_path_factory.mktemp("levels") / "levels.bin"
+    compile_levels(LEVELS, path)
+    levels = LevelFile(path)
+    yield levels
+    levels.map.close()
+
+
+# every level comes back the way level.py wrote it, tuples and lists aside
+def test_levels_load_as_compiled(levels) -> None:
+    def plain(value):
+        if isinstance(value, (list, tuple)):
+            return [plain(i) for i in value]
+        return value
+
+    assert len(levels) == len(LEVELS)
+    for n, level in enumerate(LEVELS):
+        assert plain(levels[n]) == plain(level)
+
+
+def test_negative_and_out_of_range_indexes(levels) -> None:
+    assert levels[-1] == levels[len(levels) - 1]
+    with pytest.raises(IndexError):
+        levels[len(levels)]
+
+
+def test_rejects_other_files(tmp_path) -> None:
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        LevelFile(path)
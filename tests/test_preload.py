@@ -0,0 +1,60 @@
+import threading
+import pygame
+import pytest
+from atlas import build_atlas, open_atlas
+from cache import AssetCache
+from diskcache import DiskCache
+from loader import Loader
+from store import StoredObject
+import game
+
+
+@pytest.fixture(scope="module", autouse=True)
+def window():
+    game.open_window(True)
+
+
+# paths of the pngs loaded on the main thread from now on
+def main_thread_loads(monkeypatch) -> list[str]:
+    loads, load = [], pygame.image.load
+
+    def counted(path, *args):
+        if threading.current_thread() is threading.main_thread():
+            loads.append(str(path))
+        return load(path, *args)
+
+    monkeypatch.setattr(pygame.image, "load", counted)
+    return loads
+
+
+# every level prefetched while the one before it is played is built from what
+# the loader decoded, whether masks.cache has its masks or not
+@pytest.mark.parametrize("packed", [False, True], ids=["pngs", "atlas"])
+@pytest.mark.parametrize("warm", [False, True], ids=["cold", "warm"])
+def test_prefetched_levels_load_no_pngs(monkeypatch, tmp_path, packed, warm):
+    atlas = None
+    if packed:
+        build_atlas(game.PATH, tmp_path / "atlas")
+        atlas = open_atlas(tmp_path / "atlas")
+    path = tmp_path / "masks.cache"
+    if warm:  # a run before this one went through every level
+        assets = AssetCache(None, None, DiskCache(path, game.PATH))
+        monkeypatch.setattr(game, "ASSETS", assets)
+        for level in game.LEVELS:
+            game.process_levels(level, game.BGCOLOR, False)
+    disk = DiskCache(path, game.PATH) if warm else None
+    monkeypatch.setattr(game, "ASSETS", AssetCache(None, atlas, disk))
+    monkeypatch.setattr(game, "LOADER", Loader(game.LOAD_WORKERS))
+    monkeypatch.setattr(game, "headless", False)  # else nothing is prefetched
+    monkeypatch.setattr(game, "upcoming", None)
+    game.next_level(1)
+    loads = main_thread_loads(monkeypatch)
+    for level_num in range(2, len(game.LEVELS) + 1):
+        game.upcoming.result()
+        objects = game.next_level(level_num)[1]
+        assert loads == [], f"level {level_num}"
+        if atlas is not None:  # unrotated sprites are still cut from its pages
+            for obj in objects:
+                merged = isinstance(obj, StoredObject) and obj.slot in obj.store.parts
+                if obj.angle == 0 and not merged:
+                    assert obj.image.get_abs_parent() in atlas.pages, obj.name
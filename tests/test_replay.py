@@ -0,0 +1,41 @@
+from random import Random
+import pygame
+from replay import CLICK, Keys, Recorder, decode, encode, key_bits, load
+
+
+# key bits, mouse x and y that change only now and then, like real input
+def ticks(count, seed=0) -> list[tuple[int, int, int]]:
+    rng, tick, result = Random(seed), (0, 0, 0), []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            bits = rng.randrange(CLICK * 2) if rng.random() < 0.5 else tick[0]
+            x, y = tick[1] + rng.randint(-300, 300), tick[2] + rng.randint(-3, 3)
+            tick = (bits, x, y)
+        result.append(tick)
+    return result
+
+
+def test_round_trip() -> None:
+    for seed in range(20):
+        trace = ticks(1000, seed)
+        assert decode(encode(trace)) == trace
+
+
+def test_long_idle_runs() -> None:
+    for count in [0, 1, 127, 128, 129, 256, 1000]:
+        trace = [(0, 0, 0)] * count + [(3, -5, 7)] * count
+        assert decode(encode(trace)) == trace
+
+
+def test_recorder_save_and_load(tmp_path) -> None:
+    path = tmp_path / "run.trace"
+    recorder = Recorder(4, seed=1234)
+    held = [Keys(), Keys([pygame.K_d]), Keys([pygame.K_d, pygame.K_w])]
+    for n in range(300):
+        recorder.add(held[n % 3], (n, -n), n % 7 == 0)
+    recorder.save(path)
+    level_num, seed, inputs = load(path)
+    assert (level_num, seed, len(inputs)) == (4, 1234, 300)
+    for n, (keys, mouse, click) in enumerate(inputs):
+        assert key_bits(keys, click) == key_bits(held[n % 3], n % 7 == 0)
+        assert mouse == (n, -n)
@@ -0,0 +1,96 @@
+from math import ceil
+from random import Random
+import pygame
+from spatial import cast, sweep
+
+
+class Thing:
+    def __init__(self, rect, mask) -> None:
+        self.rect, self.mask = pygame.Rect(rect), mask
+
+
+# mask of w x h that is either filled or a few random blobs. pygame's
+# get_bounding_rects can crash on broken up masks one pixel wide, so w >= 2
+def random_mask(rng, w, h) -> pygame.mask.Mask:
+    if rng.random() < 0.4:
+        return pygame.mask.Mask((w, h), fill=True)
+    mask = pygame.mask.Mask((w, h))
+    for _ in range(rng.randint(1, 4)):
+        bw, bh = rng.randint(1, w), rng.randint(1, h)
+        blob = pygame.mask.Mask((bw, bh), fill=True)
+        mask.draw(blob, (rng.randrange(w - bw + 1), rng.randrange(h - bh + 1)))
+    return mask
+
+
+# every step of the move, the first where mask overlaps one of objects
+def brute_force(mask, pos, vel, objects) -> float:
+    steps = max(ceil(max(abs(vel[0]), abs(vel[1]))), 1)
+    for step in range(steps + 1):
+        t = step / steps
+        at = [round(pos[i] + vel[i] * t) for i in [0, 1]]
+        for obj in objects:
+            if obj.mask.overlap(mask, [at[i] - obj.rect[i] for i in [0, 1]]):
+                return t
+    return None
+
+
+def test_cast_matches_brute_force() -> None:
+    rng = Random(0)
+    for _ in range(300):
+        objects = []
+        for _ in range(rng.randint(1, 8)):
+            w, h = rng.randint(2, 80), rng.randint(1, 80)
+            rect = (rng.randint(-200, 200), rng.randint(-200, 200), w, h)
+            objects.append(Thing(rect, random_mask(rng, w, h)))
+        mask = random_mask(rng, rng.randint(2, 30), rng.randint(1, 30))
+        pos = (rng.randint(-250, 250), rng.randint(-250, 250))
+        vel = (rng.uniform(-300, 300), rng.uniform(-300, 300))
+        t, hit = cast(mask, pos, vel, objects)
+        assert t == brute_force(mask, pos, vel, objects)
+        if hit is not None:
+            at = [round(pos[i] + vel[i] * t) - hit.rect[i] for i in [0, 1]]
+            assert hit.mask.overlap(mask, at)
+
+
+# a rect that only covers its corners has nothing for a bullet through the middle
+def test_cast_misses_holes() -> None:
+    mask = pygame.mask.Mask((64, 64))
+    for corner in [(0, 0), (56, 56)]:
+        mask.draw(pygame.mask.Mask((8, 8), fill=True), corner)
+    frame = Thing((100, 0, 64, 64), mask)
+    bullet = pygame.mask.Mask((4, 4), fill=True)
+    assert cast(bullet, (0, 30), (300, 0), [frame]) == (None, None)
+    assert cast(bullet, (0, 0), (300, 0), [frame])[1] is frame
+
+
+def overlaps(box, rect) -> bool:
+    return all(
+        box[i] < rect[i] + rect[i + 2] - 1e-6 and rect[i] < box[i] + box[i + 2] - 1e-6
+        for i in [0, 1]
+    )
+
+
+def test_sweep_stops_at_first_rect() -> None:
+    rng = Random(1)
+    for _ in range(300):
+        box = (0, 0, rng.randint(1, 40), rng.randint(1, 40))
+        rects = []
+        while len(rects) < 6:
+            rect = [rng.randint(-300, 300), rng.randint(-300, 300)]
+            rect += [rng.randint(1, 60), rng.randint(1, 60)]
+            if not overlaps(box, rect):
+                rects.append(rect)
+        vel = (rng.choice([0, rng.uniform(-300, 300)]), rng.uniform(-300, 300))
+        t, hit, axis = sweep(box, vel, rects)
+
+        def moved(t):
+            return [box[0] + vel[0] * t, box[1] + vel[1] * t] + list(box[2:])
+
+        for n in range(101):
+            if n / 100 <= t:
+                assert not any(overlaps(moved(n / 100), r) for r in rects)
+        if hit is None:
+            assert t == 1.0
+        else:
+            assert 0 <= t < 1 and axis in [0, 1]
+            assert overlaps(moved(t + 1e-3), rects[hit])
@@ -0,0 +1,50 @@
+from random import Random
+import pygame
+from level import LEVELS
+from tiles import merge_tiles
+
+
+def solid(entry) -> bool:
+    return entry[1] == "block"
+
+
+# merged entries cover exactly their parts, and nothing is lost or moved
+def check(entries) -> None:
+    merged = merge_tiles(entries, solid)
+    kept = []
+    for entry in merged:
+        if len(entry) == 3 and isinstance(entry[2], list) and entry[2]:
+            rect, parts = pygame.Rect(entry[0]), [pygame.Rect(p[0]) for p in entry[2]]
+            assert rect == parts[0].unionall(parts[1:])
+            assert sum(p.w * p.h for p in parts) == rect.w * rect.h
+            assert not any(
+                a.colliderect(b) for n, a in enumerate(parts) for b in parts[n + 1 :]
+            )
+            assert all(p[1] == entry[1] for p in entry[2])
+            kept += entry[2]
+        else:
+            kept.append(entry)
+    assert sorted(map(repr, kept)) == sorted(map(repr, entries))
+
+
+def test_levels() -> None:
+    for level in LEVELS:
+        check(level[1:])
+
+
+def test_random_grids() -> None:
+    rng = Random(0)
+    for _ in range(200):
+        size, entries = rng.choice([16, 32, 64]), []
+        for x in range(12):
+            for y in range(12):
+                if rng.random() < 0.6:
+                    name = rng.choice(["block", "block", "brick", "spike"])
+                    entries.append([(x * size, y * size, size, size), name])
+        rng.shuffle(entries)
+        check(entries)
+
+
+def test_merges_a_wall() -> None:
+    wall = [[(0, y * 64, 64, 64), "block"] for y in range(5)]
+    assert merge_tiles(wall, solid) == [[[0, 0, 64, 320], "block", wall]]
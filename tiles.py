@@ -0,0 +1,53 @@
+import pygame
+
+
+# level entries with runs of touching solid tiles merged: first rows of tiles
+# of the same height side by side, then columns of rows of the same width
+# stacked up. a merged run becomes [space, name, [entries in it]] in place of
+# its first tile. solid(entry) says if an entry is a tile that fills its rect,
+# and only tiles with the same name are merged
+def merge_tiles(entries, solid) -> list:
+    groups = {}  # (name, row y, height): [(rect, [indexes])]
+    for n, entry in enumerate(entries):
+        if solid(entry):
+            rect = pygame.Rect(entry[0])
+            groups.setdefault((entry[1], rect.y, rect.h), []).append((rect, [n]))
+    columns = {}  # (name, column x, width): [(rect, [indexes])]
+    for (name, _, _), tiles in groups.items():
+        for rect, members in joined(tiles, 0):
+            columns.setdefault((name, rect.x, rect.w), []).append((rect, members))
+    first, merged = {}, set()  # index of first tile: merged entry
+    for (name, _, _), runs in columns.items():
+        for rect, members in joined(runs, 1):
+            if len(members) > 1:
+                members.sort()
+                parts = [entries[n] for n in members]
+                first[members[0]] = [list(rect), name, parts]
+                merged.update(members)
+    return [
+        first.get(n, entry)
+        for n, entry in enumerate(entries)
+        if n in first or n not in merged
+    ]
+
+
+# runs of (rect, members) that touch end to end along axis
+def joined(runs, axis) -> list:
+    result = []
+    for rect, members in sorted(runs, key=lambda run: run[0][axis]):
+        last = result[-1] if result else None
+        if last and last[0][axis] + last[0][axis + 2] == rect[axis]:
+            last[0].union_ip(rect)
+            last[1].extend(members)
+        else:
+            result.append((pygame.Rect(rect), list(members)))
+    return result
+
+
+if __name__ == "__main__":
+    import game
+
+    game.open_window(True)
+    for n, level in enumerate(game.LEVELS):
+        merged = merge_tiles(level[1:], game.solid_tile)
+        print(f"level {n + 1}: {len(level) - 1} objects, {len(merged)} merged")